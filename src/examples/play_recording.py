@@ -0,0 +1,37 @@
+from ledcube.core.cube import Cube
+from ledcube.recording import Player
+
+# Usage : python src/examples/play_recording.py --loop show.lcub
+#
+# The recordings are made with the emulator, with the --record option of any example:
+#   python src/examples/shaders/shader.py --record show.lcub src/examples/shaders/rgbt.py
+
+
+class PlayRecording(Cube):
+
+    def __init__(self):
+        super().__init__()
+
+        # Add additional command line options :
+        self.parser.add_argument("recording", help="The recording file", type=str)
+        self.parser.add_argument("--loop", action="store_true", help="Play the recording in a loop")
+        self.parser.add_argument("--speed", action="store", help="Playback speed. Default: 1.0", default=1.0, type=float)
+        self.parser.add_argument("--start", action="store", help="Start at this time, in seconds. Default: 0", default=0, type=float)
+
+    def run(self):
+        player = Player(self, self.args.recording, speed=self.args.speed)
+        player.seek_time(self.args.start)
+        try:
+            player.play(loop=self.args.loop)
+        finally:
+            player.close()
+
+
+if __name__ == "__main__":
+    s = PlayRecording()
+    try:
+        s.setup()
+        s.run()
+    except KeyboardInterrupt:
+        print("bye\n")
+        s.clear()
@@ -1,6 +1,7 @@
-from ledcube.core.color import Color
+import numpy as np
+
 from ledcube.core.cube import Cube
-from ledcube.core.mapper_matrix_to_cube import canvas_to_3d
+from ledcube.core.mapper_matrix_to_cube import surface_coordinates
 
 # https://stackoverflow.com/questions/46695726/generating-pure-colors-of-equal-brightness-for-display-on-leds
 equal_brightness = True
@@ -12,29 +13,27 @@ class RGB3D(Cube):
         super().__init__()
 
     def run(self):
-
+        # the colors do not change: they are computed once, for all the pixels
+        image = self.colors()
         while True:
             self.canvas.Clear()
-            for v in range(self.matrix.height):
-                for u in range(self.matrix.width):
-                    x, y, z = canvas_to_3d(u, v)
-                    r = x+0.5
-                    g = y+0.5
-                    b = z+0.5
-                    if equal_brightness:
-                        gamma = .43
-                        r, g, b = r**(1/gamma), g**(1/gamma), b**(1/gamma)
-                        t = r + g + b
-                        if t < 0.0000001:
-                            r, g, b = 0, 0, 0
-                        else:
-                            r = r / t
-                            g = g / t
-                            b = b / t
-                            r, g, b = r**gamma, g**gamma, b**gamma
-                    self.pixel(u, v, Color(r * 255, g * 255, b * 255))
+            self.blit(image)
             self.refresh()
 
+    @staticmethod
+    def colors():
+        coords = surface_coordinates()
+        r = coords.x + 0.5
+        g = coords.y + 0.5
+        b = coords.z + 0.5
+        if equal_brightness:
+            gamma = .43
+            r, g, b = r**(1/gamma), g**(1/gamma), b**(1/gamma)
+            t = r + g + b
+            lit = t >= 0.0000001
+            t = np.where(lit, t, 1)
+            r, g, b = [np.where(lit, (c / t)**gamma, 0) for c in (r, g, b)]
+        return np.dstack((r, g, b)) * 255 * coords.valid[..., np.newaxis]
 
 if __name__ == "__main__":
     s = RGB3D()
@@ -5,7 +5,7 @@ from queue import Queue
 
 import twophase.solver as sv
 
-from ledcube.core import Face
+from ledcube.core import Face, sprite
 from ledcube.core.color import Color
 from ledcube.core.cube import Cube
 from ledcube.core.utils import v, reverse, load_font
@@ -148,16 +148,13 @@ class Rubik(Cube):
     def draw_square(self, plane, i, j, color):
         x0 = j * 21 + 2
         y0 = i * 21 + 2
-        for y in range(18):
-            for x in range(18):
-                if (y == 0 and x == 0) or (y == 0 and x == 17) or (y == 17 and x == 0) or (y == 17 and x == 17):
-                    continue
-                #
-                # Attention: we must use v(y) here because the LED-cube Y axis is from bottom to up but
-                #            the Rubik cube Y axis is top to bottom.
-                #
-                self.planes[plane.value].pixel(x0 + x, v(y0 + y), color)
-                self.mem_cube.set_pixel(plane.value, x0 + x, v(y0 + y), color)
+        #
+        # Attention: we must use v(y) here because the LED-cube Y axis is from bottom to up but
+        #            the Rubik cube Y axis is top to bottom. v(y0 + 17) is the bottom row of the square.
+        #
+        square = sprite.rounded_square(18, color)
+        self.planes[plane.value].blit_sprite(square, x0, v(y0 + 17))
+        self.mem_cube.blit_sprite(plane.value, square, x0, v(y0 + 17))
         if SHOW_FACE_COLOR:
             self.planes[plane.value].text(x0 + 2, v(y0 + 9), Color.BLACK())
 
@@ -1,4 +1,4 @@
-import math
+import numpy as np
 
 equal_brightness = True
 
@@ -10,9 +10,10 @@ def shader(x: float, y: float, z: float, t: float = 0.0) -> [float, float, float
 
     # return (math.sin(y*8+t/1)+1)/2, (math.sin(x*8+t/1)+1)/2, (math.sin(z*8+t/1)+1)/2
     # return (math.sin(y*11+t/1)+1)/2, (math.sin(x*13+t/1)+1)/2, (math.sin(z*8+t/1)+1)/3
-    return ((math.sin(y * (5+(math.sin(t/13)+1)*11) + t/1)+1)/2,
-            (math.sin(x * (5+(math.sin(t/13)+1)*11) + t/1)+1)/2,
-            (math.sin(z*8+t/1)+1)/3)
+    # numpy functions: the shader is called with the arrays of all the coordinates, see ShaderRunner
+    return ((np.sin(y * (5+(np.sin(t/13)+1)*11) + t/1)+1)/2,
+            (np.sin(x * (5+(np.sin(t/13)+1)*11) + t/1)+1)/2,
+            (np.sin(z*8+t/1)+1)/3)
 
     # r = x + 0.5
     # g = y + 0.5
@@ -2,6 +2,9 @@ import math
 
 equal_brightness = True
 
+# the colors are driven by sin(t / 7)
+PERIOD = 14 * math.pi
+
 
 def shader(x: float, y: float, z: float, t: float = 0.0) -> [float, float, float]:
     # print(x, y, z, t)
@@ -1,12 +1,7 @@
-import importlib
-import math
-import os
 import sys
-import time
 
-from ledcube.core.color import Color
 from ledcube.core.cube import Cube
-from ledcube.core.mapper_matrix_to_cube import canvas_to_3d
+from ledcube.core.shader import ShaderRunner
 
 """
     Shader coordinate system
@@ -93,17 +88,6 @@ from ledcube.core.mapper_matrix_to_cube import canvas_to_3d
 # Usage : python src/examples/shaders/shader.py -c 4 -P 3 --shader src/examples/shaders/rgbt.py
 
 
-def load_module_from_path(path):
-    module_name = os.path.splitext(os.path.basename(path))[0]
-    spec = importlib.util.spec_from_file_location(module_name, path)
-    if spec is None:
-        raise ImportError(f"Cannot load module from {path}")
-
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
-
 class Shader(Cube):
 
     def __init__(self):
@@ -111,6 +95,11 @@ class Shader(Cube):
 
         # Add additional command line options :
         self.parser.add_argument("shader", help="The shader script", type=str)
+        self.parser.add_argument("--show-frame-time", action="store_true", help="Print the time to compute the frames")
+        self.parser.add_argument("--workers", action="store", help="Number of processes computing the shaders that do not "
+                                 "support arrays. Default: 0, computed by this process", default=0, type=int)
+        self.parser.add_argument("--cache-mb", action="store", help="Size of the cache of the frames of the periodic "
+                                 "shaders, in MB. Default: 0, no cache", default=0, type=float)
 
     def run(self):
 
@@ -118,36 +107,19 @@ class Shader(Cube):
             print("ERROR: shader script missing")
             sys.exit(0)
 
-        mod = load_module_from_path(self.args.shader)
-
         # shader_script = os.path.splitext(self.args.shader)[0]   # remove extension if any
         # mod = __import__(shader_script, fromlist=["shader"])
 
-        t = 0
-        while True:
-            self.canvas.Clear()
-            for v in range(64):
-                for u in range(4 * 64):
-                    # print(u, v)
-                    r, g, b = mod.shader(*canvas_to_3d(u, v), t)
-                    # r, g, b = shader_rgb_t(*canvas_to_3d(u, v), t)
-                    self.pixel(u, v, Color(r * 255, g * 255, b * 255))
-            for v in range(64, 128):
-                for u in range(128):
-                    # r, g, b = shader_rgb_t(*canvas_to_3d(u, v), t)
-                    r, g, b = mod.shader(*canvas_to_3d(u, v), t)
-                    self.pixel(u, v, Color(r * 255, g * 255, b * 255))
-            # for v in range(self.matrix.height):
-            #     for u in range(self.matrix.width):
-            #         r, g, b = shader_rgb(*canvas_to_3d(u, v))
-            #         self.pixel(u, v, Color(r * 255, g * 255, b * 255))
-            #         return
-            # self.pixel(u, v, Color(((r * 255) + i) % 256, ((g * 255) + i) % 256, ((b * 255) + i) % 256))
-            # print(i, ((r * 255) + i) % 256)
-            # i = (i+1) % 256
-            t = t + 1
-            self.refresh()
-
+        with ShaderRunner(self, self.args.shader, workers=self.args.workers, cache_mb=self.args.cache_mb) as runner:
+            t = 0
+            while True:
+                runner.draw(t)
+                t = t + 1
+                self.refresh()
+                if self.args.show_frame_time and runner.frames % 50 == 0:
+                    mode = "per pixel" if runner.per_pixel else "arrays"
+                    print(f"\r\033[Kframe time: {runner.frame_time * 1000:.1f} ms, "
+                          f"average: {runner.average_frame_time * 1000:.1f} ms ({mode})", end="", flush=True)
 
 if __name__ == "__main__":
     s = Shader()
@@ -1,12 +1,20 @@
 import math
 
+import numpy as np
 
-def shader(x: float, y: float, z: float, t: float = 0.0) -> [float, float, float]:
+
+def precompute(x, y, z):
+    # the angles do not depend on t: they are computed once by the ShaderRunner and given to shader()
+    return {'angle': np.arctan2(z, x)}
+
+
+def shader(x: float, y: float, z: float, t: float = 0.0, angle: float = None) -> [float, float, float]:
 
     # TODO: use perlin noise for the amplitude factor
 
     # angle = math.atan2(y, x) * math.sin(t/10)
-    angle = math.atan2(z, x)
+    if angle is None:
+        angle = math.atan2(z, x)
     # if angle < 0:
     #     angle += 2 * math.pi
     # if abs(z - math.sin(angle*3*math.pi + t/20) / math.pi) < 0.01:
@@ -1,70 +1,26 @@
-import importlib
-import math
-import os
-import sys
-import time
+import numpy as np
 
-from ledcube.core.color import Color
-from ledcube.core.cube import Cube
-from ledcube.core.mapper_matrix_to_cube import canvas_to_3d
+# Same waves as waves.py, computed with arrays: the shader is called once per frame for all the pixels.
+#
+# Usage : python src/examples/shaders/shader.py -c 4 -P 3 src/examples/shaders/waves_optimized.py
 
+CYAN = np.array([0, 1, 1])
+YELLOW = np.array([1, 1, 0])
 
-class Shader(Cube):
 
-    def __init__(self):
-        super().__init__()
+def precompute(x, y, z):
+    # the angle of each pixel around the Y-axis, computed once
+    return {'angle': np.arctan2(z, x)}
 
-        # Add additional command line options :
-        self.parser.add_argument("shader", help="The shader script", type=str)
 
-    def run(self):
+def shader(x, y, z, t=0.0, angle=None):
+    if angle is None:
+        angle = np.arctan2(z, x)
 
-        if not self.args.shader:
-            print("ERROR: shader script missing")
-            sys.exit(0)
+    # the period MUST be a integer multiple of "angle"
+    wave1 = np.abs(y - np.sin(angle*5 + t/11) / abs(np.cos(t/10)*2+5)) < 0.01
+    wave2 = np.abs(y - np.cos(angle*4 - t/7) / abs(np.cos(t/10+3)*2+6)) < 0.01
 
-        # mod = load_module_from_path(self.args.shader)
-
-        # shader_script = os.path.splitext(self.args.shader)[0]   # remove extension if any
-        # mod = __import__(shader_script, fromlist=["shader"])
-
-        t = 0
-        while True:
-            self.canvas.Clear()
-
-            # Optimization problem : the angle has to be computed for each coord
-            # TODO: pre-compute all angles
-
-            # angle = math.atan2(z, x)
-
-            for v in range(64):
-                for u in range(4 * 64):
-                    # print(u, v)
-                    r, g, b = mod.shader(*canvas_to_3d(u, v), t)
-                    # r, g, b = shader_rgb_t(*canvas_to_3d(u, v), t)
-                    self.pixel(u, v, Color(r * 255, g * 255, b * 255))
-            for v in range(64, 128):
-                for u in range(128):
-                    # r, g, b = shader_rgb_t(*canvas_to_3d(u, v), t)
-                    r, g, b = mod.shader(*canvas_to_3d(u, v), t)
-                    self.pixel(u, v, Color(r * 255, g * 255, b * 255))
-            # for v in range(self.matrix.height):
-            #     for u in range(self.matrix.width):
-            #         r, g, b = shader_rgb(*canvas_to_3d(u, v))
-            #         self.pixel(u, v, Color(r * 255, g * 255, b * 255))
-            #         return
-            # self.pixel(u, v, Color(((r * 255) + i) % 256, ((g * 255) + i) % 256, ((b * 255) + i) % 256))
-            # print(i, ((r * 255) + i) % 256)
-            # i = (i+1) % 256
-            t = t + 1
-            self.refresh()
-
-
-if __name__ == "__main__":
-    s = Shader()
-    try:
-        s.setup()
-        s.run()
-    except KeyboardInterrupt:
-        print("bye\n")
-        s.clear()
+    # the first wave is drawn over the second one
+    color = np.where(wave1[..., np.newaxis], CYAN, np.where(wave2[..., np.newaxis], YELLOW, 0))
+    return color[..., 0], color[..., 1], color[..., 2]
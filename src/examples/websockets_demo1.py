@@ -8,6 +8,7 @@ from enum import Enum
 from math import copysign, sin, cos
 from queue import Queue
 
+import numpy as np
 import segno
 import uvicorn
 from fastapi import FastAPI, WebSocket
@@ -15,7 +16,7 @@ from fastapi import FastAPI, WebSocket
 from ledcube.core import Face, rgb_graphics
 from ledcube.core.color import Color
 from ledcube.core.cube import Cube
-from ledcube.core.mapper_matrix_to_cube import canvas_to_3d
+from ledcube.core.mapper_matrix_to_cube import surface_coordinates
 from ledcube.core.remote import get_cube_ip
 from ledcube.core.utils import normalize, rot_y, r2d, rot_x, reverse, load_font, get_orthonormal_basis_vectors, \
     map_to_panel
@@ -132,27 +133,15 @@ class ThreadedApp(Cube):
 
     def demo_gradient_color_gamma(self, gamma=None):
         self.clear()
-        f = self.planes[Face.FRONT.value]
-        for v in range(self.matrix.height):
-            for u in range(self.matrix.width):
-                x, y, z = canvas_to_3d(u, v)
-                r = x+0.5
-                g = y+0.5
-                b = z+0.5
-                c = Color(r * 255, g * 255, b * 255)
-                if gamma is not None and gamma > 0.0:
-                    c.gamma(gamma)
-                    # gamma = .43
-                    # r, g, b = r**(1/gamma), g**(1/gamma), b**(1/gamma)
-                    # t = r + g + b
-                    # if t < 0.000001:
-                    #     r, g, b = 0, 0, 0
-                    # else:
-                    #     r = r / t
-                    #     g = g / t
-                    #     b = b / t
-                    #     r, g, b = r**gamma, g**gamma, b**gamma
-                self.pixel(u, v, c)
+        coords = surface_coordinates()
+        rgb = np.dstack((coords.x + 0.5, coords.y + 0.5, coords.z + 0.5))
+        if gamma is not None and gamma > 0.0:
+            # same as Color.gamma(), for all the pixels
+            rgb = rgb**(1/gamma)
+            t = rgb.sum(axis=2, keepdims=True)
+            lit = t >= 0.000001
+            rgb = np.where(lit, (rgb / np.where(lit, t, 1))**gamma, 0)
+        self.blit(rgb * 255 * coords.valid[..., np.newaxis])
         self.refresh()
 
     def demo_text1(self):
@@ -414,14 +403,18 @@ class ThreadedApp(Cube):
                 dx = 32 * p.ax
                 dy = 32 * p.ay
 
+                # the lines of the plane are drawn in one call
+                lines = []
+                colors = []
+
                 if SHOW_AXES:
                     # X acceleration
-                    p.line(31, 31, 31 + dx, 31, Color.GREEN() if p.ax > 0 else Color.BLUE())
-                    p.line(31, 32, 31 + dx, 32, Color.GREEN() if p.ax > 0 else Color.BLUE())
+                    lines += [(31, 31, 31 + dx, 31), (31, 32, 31 + dx, 32)]
+                    colors += [Color.GREEN() if p.ax > 0 else Color.BLUE()] * 2
 
                     # Y acceleration
-                    p.line(31, 32, 31, 31 + dy, Color.GREEN() if p.ay > 0 else Color.BLUE())
-                    p.line(32, 32, 32, 31 + dy, Color.GREEN() if p.ay > 0 else Color.BLUE())
+                    lines += [(31, 32, 31, 31 + dy), (32, 32, 32, 31 + dy)]
+                    colors += [Color.GREEN() if p.ay > 0 else Color.BLUE()] * 2
 
                     # Z acceleration
                     # p.circle(31, 31, 16 * abs(p.vz), Color.GREEN() if p.vz > 0 else Color.BLUE())
@@ -440,9 +433,13 @@ class ThreadedApp(Cube):
                             if abs(y) > 32:
                                 y = 32 * copysign(1, dy)
                                 x = int(y / slope)
-                        p.line(31, 31, 31 + x, 31 + y, Color.RED())
+                        lines.append((31, 31, 31 + x, 31 + y))
                     else:
-                        p.line(31, 31, 31 + dx, 31 + dy, Color.RED())
+                        lines.append((31, 31, 31 + dx, 31 + dy))
+                    colors.append(Color.RED())
+
+                if lines:
+                    p.lines(lines, colors)
 
                 if SHOW_ACCEL:
                     # IMU :
@@ -9,7 +9,7 @@ from queue import Queue
 import uvicorn
 from fastapi import FastAPI, WebSocket
 
-from ledcube.core import Face
+from ledcube.core import Face, sprite
 from ledcube.core.color import Color
 from ledcube.core.cube import Cube
 
@@ -117,11 +117,10 @@ class ThreadedApp(Cube):
             p.border(border_color)
         if label:
             p.text(29, 8, Color.WHITE(), f'{value}')
+        dot = sprite.dot(DOT_RADIUS, self.dots_color, self.dots_border_color)
         for dot_index in NUMBER_TO_DOTS[value]:
             x, y = dot_positions[dot_index]
-            p.fill_circle(x, y, DOT_RADIUS, self.dots_color)
-            if self.dots_border_color:
-                p.circle(x, y, DOT_RADIUS, self.dots_border_color)
+            p.blit_sprite(dot, x - DOT_RADIUS, y - DOT_RADIUS)
 
     def draw_dice(self):
         bottom_value = 7 - self.top_value
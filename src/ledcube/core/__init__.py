@@ -1,6 +1,8 @@
 import importlib
+import threading
 
 from .enums import Face
+from .sprite import Sprite
 import io
 
 
@@ -17,10 +19,43 @@ def is_raspberrypi():
 
 running_on_pi = is_raspberrypi()
 
-# Dynamically import the appropriate module
-if running_on_pi:
-    rgb_matrix_lib = importlib.import_module('rgbmatrix')
-    rgb_graphics = importlib.import_module('rgbmatrix.graphics')
+# The backend (rgbmatrix on the Pi, the emulator elsewhere) and the IMU are created on first use, not when
+# ledcube.core is imported: importing a module of ledcube.core does not touch the hardware.
+# rgb_matrix_lib, rgb_graphics and imu are still available as attributes of this module.
+_imu = None
+_imu_lock = threading.Lock()
+
+
+def get_rgb_matrix_lib():
+    if running_on_pi:
+        return importlib.import_module('rgbmatrix')
+    return importlib.import_module('ledcube.emulator')
+
+
+def get_rgb_graphics():
+    if running_on_pi:
+        return importlib.import_module('rgbmatrix.graphics')
+    return importlib.import_module('ledcube.emulator.graphics')
+
+
+def get_imu(background_calibration=False):
+    """Return the IMU, created on the first call.
+
+    On the Pi, the IMU is calibrated (aligned) when it is created. This blocks for the time of the
+    calibration reads, unless background_calibration is True: then the calibration is done by a thread,
+    and the IMU returns uncalibrated values until it is done.
+    """
+    global _imu
+    with _imu_lock:
+        if _imu is None:
+            _imu = _create_imu(background_calibration)
+    return _imu
+
+
+def _create_imu(background_calibration):
+    if not running_on_pi:
+        from ..imu.imu_emulator import ImuEmulator
+        return ImuEmulator()
 
     import board
     from ..imu import lis3dh_basic
@@ -28,15 +63,29 @@ if running_on_pi:
     i2c = board.I2C()  # uses board.SCL and board.SDA
     imu = lis3dh_basic.LIS3DH_I2C(i2c, address=0x18)
     imu.range = lis3dh_basic.RANGE_2_G
-    imu.use_offset = True
 
-else:
-    # rgb_matrix_lib = importlib.import_module('RGBMatrixEmulator')
-    rgb_matrix_lib = importlib.import_module('ledcube.emulator')
-    # rgb_graphics = importlib.import_module('RGBMatrixEmulator.graphics')
-    rgb_graphics = importlib.import_module('ledcube.emulator.graphics')
-    # from RGBMatrixEmulator import RGBMatrixOptions, RGBMatrix, graphics
+    if background_calibration:
+        def calibrate():
+            imu.align()
+            imu.use_offset = True
+
+        threading.Thread(target=calibrate, name="ImuCalibrationThread", daemon=True).start()
+    else:
+        imu.use_offset = True
+
+    return imu
+
 
-    from ..imu.imu_emulator import ImuEmulator
-    imu = ImuEmulator()
+def __getattr__(name):
+    # PEP 562: the module attributes created on first access
+    if name == 'rgb_matrix_lib':
+        value = get_rgb_matrix_lib()
+    elif name == 'rgb_graphics':
+        value = get_rgb_graphics()
+    elif name == 'imu':
+        value = get_imu()
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+    globals()[name] = value
+    return value
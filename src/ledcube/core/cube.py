@@ -1,8 +1,12 @@
 import argparse
+import atexit
 
-from ledcube.core import Face, running_on_pi, rgb_matrix_lib, rgb_graphics, imu
+import numpy as np
+
+from ledcube.core import Face, running_on_pi, get_rgb_matrix_lib, get_rgb_graphics, get_imu
 from ledcube.core.enums import Coord3D
 from ledcube.core.plane import Plane
+from ledcube.core.sprite import disk_lines
 from ledcube.core.utils import load_font
 
 #
@@ -18,7 +22,7 @@ CUBE_PIXEL_MAPPER = "Cube"  # The pixel mapping; see rpi_rgb_led_matrix/lib/pixe
 # the emulator uses a custom pixel mapper to display the cube in a "unfolded" configuration.
 EMULATOR_LED_CHAINS = 4
 EMULATOR_LED_PARALLEL = 3
-EMULATOR_DEFAULT_BRIGHTNESS = 100   # with the emulator, a value less than 100 will lead to fading pixels
+EMULATOR_DEFAULT_BRIGHTNESS = 100   # the emulator applies the brightness when presenting the frame; the frame is not modified
 
 
 class Cube(object):
@@ -26,6 +30,7 @@ class Cube(object):
     def __init__(self, *args, **kwargs):
 
         self.planes = None
+        self.recorder = None
         self.canvas = None
         self.matrix = None
         self.parser = argparse.ArgumentParser()
@@ -56,6 +61,7 @@ class Cube(object):
             self.parser.add_argument("--led-row-addr-type", action="store", help="0 = default; 1=AB-addressed panels; 2=row direct; 3=ABC-addressed panels; 4 = ABC Shift + DE direct", default=0, type=int, choices=[0,1,2,3,4])
             self.parser.add_argument("--led-multiplexing", action="store", help="Multiplexing type: 0=direct; 1=strip; 2=checker; 3=spiral; 4=ZStripe; 5=ZnMirrorZStripe; 6=coreman; 7=Kaler2Scan; 8=ZStripeUneven... (Default: 0)", default=0, type=int)
             self.parser.add_argument("--led-panel-type", action="store", help="Needed to initialize special panels. Supported: 'FM6126A'", default="", type=str)
+            self.parser.add_argument("--imu-background-calibration", action="store_true", help="Calibrate the IMU in the background instead of when it is first used")
             self.parser.add_argument("--led-no-drop-privs", dest="drop_privileges", help="Don't drop privileges from 'root' after initializing the hardware.", action='store_false')
             self.parser.set_defaults(drop_privileges=True)
         else:
@@ -68,11 +74,12 @@ class Cube(object):
             self.parser.add_argument("-b", "--led-brightness", action="store",
                                      help=f"Sets brightness level. Default: {EMULATOR_DEFAULT_BRIGHTNESS}. Range: 1..100",
                                      default=EMULATOR_DEFAULT_BRIGHTNESS, type=int)
+            self.parser.add_argument("--record", action="store", help="Record the frames to this file", metavar="FILE", type=str)
 
         self.args = None
         self.resolution = 1
         self.font = load_font("6x10.bdf")
-        self.imu = imu
+        self.__imu = None
 
     def setup(self):
 
@@ -80,6 +87,7 @@ class Cube(object):
 
         self.args = self.parser.parse_args()
 
+        rgb_matrix_lib = get_rgb_matrix_lib()
         options = rgb_matrix_lib.RGBMatrixOptions()
 
         options.rows = self.args.led_rows
@@ -111,6 +119,11 @@ class Cube(object):
         self.matrix = rgb_matrix_lib.RGBMatrix(options=options)
         self.canvas = self.matrix.CreateFrameCanvas()
 
+        if not running_on_pi and self.args.record:
+            from ledcube.recording import RecordingWriter
+            self.recorder = RecordingWriter(self.args.record, panel_size=self.args.led_rows)
+            atexit.register(self.recorder.close)
+
         self.planes = [
             # FRONT
             # (1) : the X-axis(IMU) is represented by the X-axis(front panel)
@@ -138,26 +151,122 @@ class Cube(object):
             Plane(self, Face.BOTTOM, x_axis=Coord3D(1, 0, 0), y_axis=Coord3D(0, -1, 0))
         ]
 
+        if running_on_pi and self.args.imu_background_calibration:
+            get_imu(background_calibration=True)
+
         return True
 
+    @property
+    def imu(self):
+        """The IMU, created (and calibrated) on first use."""
+        if self.__imu is None:
+            self.__imu = get_imu()
+        return self.__imu
+
+    @imu.setter
+    def imu(self, imu):
+        self.__imu = imu
+
     def clear(self):
         self.canvas.Clear()
 
     def refresh(self):
+        if self.recorder:
+            self.recorder.write(self.canvas.frame)
         self.canvas = self.matrix.SwapOnVSync(self.canvas)
 
     def pixel(self, x, y, color):
         self.canvas.SetPixel(x, y, color.red, color.green, color.blue)
 
+    def pixels(self, xs, ys, color):
+        """Set many pixels in one call.
+
+        `color` is either a Color or an array with one (r, g, b) value per pixel.
+        """
+        rgb = np.asarray((color.red, color.green, color.blue) if hasattr(color, 'red') else color)
+        if running_on_pi:
+            # rgbmatrix has no batch SetPixel
+            # rgbmatrix takes ints, not numpy scalars
+            xs = np.asarray(xs).astype(int).tolist()
+            ys = np.asarray(ys).astype(int).tolist()
+            if rgb.ndim > 1:
+                for x, y, (r, g, b) in zip(xs, ys, rgb.astype(int).tolist()):
+                    self.canvas.SetPixel(x, y, r, g, b)
+            else:
+                r, g, b = rgb.astype(int).tolist()
+                for x, y in zip(xs, ys):
+                    self.canvas.SetPixel(x, y, r, g, b)
+        else:
+            self.canvas.SetPixels(xs, ys, rgb)
+
+    def blit(self, array, x=0, y=0):
+        """Copy a (height, width, 3) array of RGB values, indexed [y, x], to the canvas.
+
+        (x, y) is the position of the upper left corner of the array in the canvas.
+        The array can also have a 4th channel, alpha: see Sprite.
+        """
+        if running_on_pi:
+            if array.shape[2] == 4:
+                # rgbmatrix has no alpha blending and its canvas can not be read
+                ys, xs = np.nonzero(array[..., 3] >= 128)
+                self.pixels(xs + x, ys + y, array[ys, xs, :3])
+                return
+            from PIL import Image
+            if array.dtype != np.uint8:
+                array = np.clip(array, 0, 255).astype(np.uint8)
+            self.canvas.SetImage(Image.fromarray(np.ascontiguousarray(array), 'RGB'), x, y)
+        else:
+            self.canvas.SetArray(array, x, y)
+
     def line(self, x0, y0, x1, y1, color):
-        rgb_graphics.DrawLine(self.canvas, x0, y0, x1, y1, color)
+        get_rgb_graphics().DrawLine(self.canvas, x0, y0, x1, y1, color)
+
+    def lines(self, lines, color):
+        """Draw many lines in one call.
+
+        `lines` is a sequence of (x0, y0, x1, y1). `color` is a Color or a sequence with one Color per line.
+        """
+        if running_on_pi:
+            # rgbmatrix has no batch drawing
+            colors = [color] * len(lines) if hasattr(color, 'red') else color
+            for (x0, y0, x1, y1), line_color in zip(lines, colors):
+                get_rgb_graphics().DrawLine(self.canvas, int(x0), int(y0), int(x1), int(y1), line_color)
+        else:
+            get_rgb_graphics().DrawLines(self.canvas, lines, color)
 
     def circle(self, x0, y0, r, color):
-        rgb_graphics.DrawCircle(self.canvas, x0, y0, r, color)
+        get_rgb_graphics().DrawCircle(self.canvas, x0, y0, r, color)
+
+    def circles(self, circles, color):
+        """Draw many circles in one call.
+
+        `circles` is a sequence of (x0, y0, r). `color` is a Color or a sequence with one Color per circle.
+        """
+        if running_on_pi:
+            colors = [color] * len(circles) if hasattr(color, 'red') else color
+            for (x0, y0, r), circle_color in zip(circles, colors):
+                get_rgb_graphics().DrawCircle(self.canvas, int(x0), int(y0), int(r), circle_color)
+        else:
+            get_rgb_graphics().DrawCircles(self.canvas, circles, color)
+
+    def fill_rect(self, x, y, width, height, color):
+        """Fill the rectangle whose upper left corner is (x, y)."""
+        if running_on_pi:
+            if width > 0 and height > 0:
+                self.blit(np.full((int(height), int(width), 3), (color.red, color.green, color.blue)), x, y)
+        else:
+            get_rgb_graphics().FillRect(self.canvas, x, y, width, height, color)
+
+    def fill_circle(self, x0, y0, r, color):
+        """Fill the disk of center (x0, y0) and radius r, the shape of the fillCircle of Adafruit GFX."""
+        if running_on_pi:
+            self.lines(disk_lines(int(x0), int(y0), int(r)), color)
+        else:
+            get_rgb_graphics().FillCircle(self.canvas, x0, y0, r, color)
 
     def dot(self, p, part):
         x, y, z = part.position()
         self.circle(x // self.resolution, y // self.resolution, 4, part.getcolor())
 
     def text(self, x, y, color, text, font=None):
-        rgb_graphics.DrawText(self.canvas, font if font else self.font, x, y, color, text)
+        get_rgb_graphics().DrawText(self.canvas, font if font else self.font, x, y, color, text)
@@ -83,6 +83,17 @@
 """
 
 
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from ledcube.core.enums import Face, PANEL
+
+
+SurfaceCoordinates = namedtuple('SurfaceCoordinates', ['x', 'y', 'z', 'face', 'valid'])
+
+
 def canvas_to_3d(x0, y0):
     """Return a 3D coord (x, y, z) from a canvas (x, y) coord.
 
@@ -144,6 +155,48 @@ def canvas_to_3d(x0, y0):
     return cx, cy, cz
 
 
+@lru_cache(maxsize=None)
+def surface_coordinates(panel_size=PANEL):
+    """Return the 3D coordinates of all the pixels of the canvas, computed once per panel size.
+
+    The result is a SurfaceCoordinates of read-only (2 * panel_size, 4 * panel_size) arrays indexed [y, x]
+    like the canvas, in the logical layout of canvas_to_3d():
+
+        x, y, z     float32, the coordinates returned by canvas_to_3d() for each pixel
+        face        int8, the Face value of each pixel, -1 for the pixels that are not on a face
+        valid       bool, True for the pixels that are on a face
+
+    The pixels that are not on a face have the coordinates (0, 0, 0).
+    """
+    p = panel_size
+    n = p - 1
+    rows, columns = np.mgrid[0:2 * p, 0:4 * p]
+    local_x = columns % p
+    local_y = rows % p
+
+    face = np.full(rows.shape, -1, dtype=np.int8)
+    face[rows < p] = columns[rows < p] // p     # FRONT, RIGHT, BACK and LEFT are in this order
+    face[(rows >= p) & (columns < p)] = Face.TOP.value
+    face[(rows >= p) & (columns >= p) & (columns < 2 * p)] = Face.BOTTOM.value
+
+    # same expressions as canvas_to_3d(), evaluated for all the pixels
+    increasing_x = local_x / n - 0.5
+    decreasing_x = 1 - local_x / n - 0.5
+    increasing_y = local_y / n - 0.5
+    decreasing_y = 1 - local_y / n - 0.5
+    zeros = np.zeros(rows.shape)
+
+    conditions = [face == f.value for f in (Face.FRONT, Face.RIGHT, Face.BACK, Face.LEFT, Face.TOP, Face.BOTTOM)]
+    x = np.select(conditions, [increasing_x, 0.5, decreasing_x, -0.5, increasing_x, increasing_x], zeros)
+    y = np.select(conditions, [decreasing_y, decreasing_y, decreasing_y, decreasing_y, 0.5, -0.5], zeros)
+    z = np.select(conditions, [0.5, decreasing_x, -0.5, increasing_x, increasing_y, decreasing_y], zeros)
+
+    arrays = [a.astype(np.float32) for a in (x, y, z)] + [face, face >= 0]
+    for array in arrays:
+        array.flags.writeable = False
+    return SurfaceCoordinates(*arrays)
+
+
 # def canvas_to_3d(x0, y0):
 #     """Return a 3D coord (x, y, z) from a canvas (x, y) coord.
 #
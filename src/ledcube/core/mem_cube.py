@@ -3,6 +3,7 @@
 class MemCube:
     def __init__(self, n):
         # Each face of the cube is an n x n matrix (initially zeros)
+        # The faces are nested lists rather than an array: get_pixel() is called per pixel in the Rubik animations
         self.n = n
         self.faces = [[[[0, 0, 0] for _ in range(n)] for _ in range(n)] for _ in range(6)]
 
@@ -14,6 +15,17 @@ class MemCube:
         """Get the value of a specific pixel"""
         return tuple(self.faces[face][row][col])
 
+    def blit_sprite(self, face, sprite, row, col):
+        """Copy the visible pixels of a Sprite, like Plane.blit_sprite() at (x, y) = (row, col)"""
+        # the faces are indexed [row, col] = [x, y] while the sprites are indexed [y, x]
+        rows = min(sprite.width, self.n - row)
+        cols = min(sprite.height, self.n - col)
+        pixels = sprite.pixels[:cols, :rows].transpose(1, 0, 2).tolist()
+        for face_row, sprite_row in zip(self.faces[face][row:row + rows], pixels):
+            for c, (r, g, b, a) in enumerate(sprite_row, col):
+                if a > 0:
+                    face_row[c] = [r, g, b]
+
     # def rotate_cube(self, axis, angle):
     #     """Rotate the entire cube around a given axis ('x', 'y', or 'z') by a specified angle"""
     #     radians = math.radians(angle)
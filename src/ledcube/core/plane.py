@@ -1,10 +1,19 @@
+import numpy as np
+
+from ledcube.core import running_on_pi
 from ledcube.core.enums import Coord3D, Coord2D, FACES_LABELS, face_offsets, FACES_NAMES
-from ledcube.core.utils import cross_product, u, v, get_non_zero_axis_label
+from ledcube.core.utils import cross_product, dot_product, u, v, get_non_zero_axis_label
 
 
 # TODO: what is resolution?
 
 
+def _to_uint8(array):
+    if array.dtype == np.uint8:
+        return array
+    return np.clip(array, 0, 255).astype(np.uint8)
+
+
 class Plane:
     def __init__(self, parent, face, offset=None, x_axis=Coord3D(0, 0, 0), y_axis=Coord3D(0, 0, 0), z_axis=None, resolution=1):
         self.parent = parent
@@ -31,18 +40,75 @@ class Plane:
         self.ay = gx * self.x_axis.y + gy * self.y_axis.y + gz * self.z_axis.y
         self.az = gx * self.x_axis.z + gy * self.y_axis.z + gz * self.z_axis.z
 
+    @property
+    def view(self):
+        """The face as a writable (64, 64, 3) uint8 view of the canvas, indexed [y, x] in the plane coordinates.
+
+        The rows are flipped by the view itself, not copied. None on the Pi, where the canvas is not an array.
+        """
+        if running_on_pi:
+            return None
+        return self.parent.canvas.frame[self.offset.y:self.offset.y + 64, self.offset.x:self.offset.x + 64][::-1]
+
     def pixel(self, x, y, color):
         self.parent.pixel(self.offset.x + u(x), self.offset.y + v(y), color)
 
+    def pixels(self, xs, ys, color):
+        self.parent.pixels(self.offset.x + np.asarray(xs), self.offset.y + 63 - np.asarray(ys), color)
+
+    def blit(self, array, x=0, y=0):
+        """Copy a (height, width, 3) array of RGB values to the plane.
+
+        The array is indexed [y, x] in the plane coordinates, with the Y-axis pointing up like for pixel().
+        (x, y) is the position of array[0, 0] in the plane. The parts outside the plane are ignored.
+        """
+        height, width = array.shape[:2]
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + width, 64)
+        y1 = min(y + height, 64)
+        if x0 >= x1 or y0 >= y1:
+            return
+        view = self.view
+        if view is not None and array.shape[2] == 3:
+            view[y0:y1, x0:x1] = _to_uint8(array[y0 - y:y1 - y, x0 - x:x1 - x])
+            return
+        # flip the rows because the canvas Y-axis is pointing down
+        self.parent.blit(array[y0 - y:y1 - y, x0 - x:x1 - x][::-1], self.offset.x + u(x0), self.offset.y + v(y1 - 1))
+
+    def blit_sprite(self, sprite, x=0, y=0):
+        """Draw a Sprite with its lower left corner at (x, y). The parts outside the plane are ignored."""
+        self.blit(sprite.rgb if sprite.opaque else sprite.pixels, x, y)
+
     def line(self, x0, y0, x1, y1, color, inverse_y=True):
         if inverse_y:
             self.parent.line(self.offset.x + u(x0), self.offset.y + v(y0), self.offset.x + u(x1), self.offset.y + v(y1), color)
         else:
             self.parent.line(self.offset.x + u(x0), self.offset.y + y0, self.offset.x + u(x1), self.offset.y + y1, color)
 
+    def lines(self, lines, color):
+        """Draw many lines in one call. `lines` is a sequence of (x0, y0, x1, y1), `color` as for Cube.lines()."""
+        lines = np.asarray(lines, dtype=float).reshape(-1, 4)
+        self.parent.lines(np.column_stack((self.offset.x + lines[:, 0], self.offset.y + 63 - lines[:, 1],
+                                           self.offset.x + lines[:, 2], self.offset.y + 63 - lines[:, 3])), color)
+
     def circle(self, x, y, r, color):
         self.parent.circle(self.offset.x + u(x), self.offset.y + v(y), r, color)
 
+    def circles(self, circles, color):
+        """Draw many circles in one call. `circles` is a sequence of (x, y, r), `color` as for Cube.circles()."""
+        self.parent.circles([(self.offset.x + u(x), self.offset.y + v(y), r) for x, y, r in circles], color)
+
+    def fill_rect(self, x, y, width, height, color):
+        """Fill the rectangle whose lower left corner is (x, y). The parts outside the plane are ignored."""
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + width, 64)
+        y1 = min(y + height, 64)
+        if x0 >= x1 or y0 >= y1:
+            return
+        self.parent.fill_rect(self.offset.x + u(x0), self.offset.y + v(y1 - 1), x1 - x0, y1 - y0, color)
+
     def text(self, x, y, color, t, f=None):
         self.parent.text(self.offset.x + u(x), self.offset.y + v(y), color, t, f)
 
@@ -69,65 +135,61 @@ class Plane:
                 self.text(9, 17, color, f"{value}", font)
 
     def border(self, color):
-        self.line(0, 0, 63, 0, color)
-        self.line(63, 0, 63, 63, color)
-        self.line(0, 63, 63, 63, color)
-        self.line(0, 0, 0, 63, color)
+        self.lines([(0, 0, 63, 0), (63, 0, 63, 63), (0, 63, 63, 63), (0, 0, 0, 63)], color)
 
     def fill(self, color):
-        for y in range(self.offset.y, self.offset.y + 64):
-            for x in range(self.offset.x, self.offset.x + 64):
-                self.parent.pixel(x, y, color)
+        self.__fill([min(max(int(c), 0), 255) for c in (color.red, color.green, color.blue)])
 
-    def fill_circle(self, x0, y0, r, color):
-        """
-        https://github.com/adafruit/Adafruit-GFX-Library/blob/master/Adafruit_GFX.cpp#L471
-        https://adafruit.github.io/Adafruit-GFX-Library/html/class_adafruit___g_f_x.html
-        :param face:
-        :param x0:
-        :param y0:
-        :param r:
-        :param corners:
-        :param delta:
-        :param color:
-        :return:
-        """
-
-        if r <= 0:
-            return
-
-        if r == 1:
-            self.pixel(x0, y0, color)
-            return
-
-        f = 1 - r
-        dd_f_x = 1
-        dd_f_y = -2 * r
-        x = 0
-        y = r
-        px = x
-        py = y
+    def clear(self):
+        self.__fill([0, 0, 0])
 
-        while x < y:
-
-            if f >= 0:
-                y -= 1
-                dd_f_y += 2
-                f += dd_f_y
-
-            x += 1
-            dd_f_x += 2
-            f += dd_f_x
-
-            self.line(x0, y0 - y, x0, y0 - y + 2 * y, color)
-
-            if x <= (y + 1):
-                self.line(x0 + x, y0 - y, x0 + x, y0 - y + 2 * y, color)
-                self.line(x0 - x, y0 - y, x0 - x, y0 - y + 2 * y, color)
-
-            if y != py:
-                self.line(x0 + py, y0 - px, x0 + py, y0 - px + 2 * px, color)
-                self.line(x0 - py, y0 - px, x0 - py, y0 - px + 2 * px, color)
-                py = y
+    def __fill(self, rgb):
+        view = self.view
+        if view is None:
+            self.parent.blit(np.full((64, 64, 3), rgb, dtype=np.uint8), self.offset.x, self.offset.y)
+        else:
+            # copying whole rows is much faster than broadcasting a 3 bytes color
+            view.reshape(64, 192)[...] = np.array(rgb * 64, dtype=np.uint8)
+
+    def copy(self):
+        """Return a copy of the face, a (64, 64, 3) array indexed [y, x] like the view. Not available on the Pi."""
+        view = self.view
+        if view is None:
+            raise RuntimeError("The faces can not be read on the Pi")
+        return view.copy()
+
+    def orient(self, array, other):
+        """Return a face array of this plane oriented for the other plane.
+
+        Each axis of this plane is mapped to the parallel axis of the other plane, in the same direction; an axis
+        that has no parallel axis on the other plane is mapped to the remaining axis. The result is a view of the
+        array, rotated or mirrored.
+        """
+        targets = [None, None]     # (axis of the other plane, direction) for x and y
+        for i, axis in enumerate((self.x_axis, self.y_axis)):
+            for j, other_axis in enumerate((other.x_axis, other.y_axis)):
+                d = dot_product(axis, other_axis)
+                if d:
+                    targets[i] = (j, 1 if d > 0 else -1)
+        if targets[0] is None and targets[1] is None:
+            targets = [(0, 1), (1, 1)]
+        elif targets[0] is None:
+            targets[0] = (1 - targets[1][0], 1)
+        elif targets[1] is None:
+            targets[1] = (1 - targets[0][0], 1)
+
+        # the arrays are indexed [y, x]: array axis 0 is the y axis of the plane and array axis 1 the x axis
+        if targets[0][0] == 1:
+            array = array.swapaxes(0, 1)
+        for target, direction in targets:
+            if direction < 0:
+                array = np.flip(array, axis=1 - target)
+        return array
+
+    def copy_to(self, other):
+        """Copy the face to another plane, oriented by orient(). Not available on the Pi."""
+        other.blit(self.orient(self.copy(), other))
 
-            px = x
+    def fill_circle(self, x0, y0, r, color):
+        """Fill the disk of center (x0, y0) and radius r, like Cube.fill_circle()."""
+        self.parent.fill_circle(self.offset.x + u(x0), self.offset.y + v(y0), r, color)
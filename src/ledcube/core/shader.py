@@ -0,0 +1,358 @@
+import importlib.util
+import os
+import time
+import zlib
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ledcube.core.enums import PANEL
+from ledcube.core.mapper_matrix_to_cube import surface_coordinates
+
+
+ShaderScript = namedtuple('ShaderScript', ['shader', 'precompute', 'period'])
+
+# Period detection of ShaderRunner: a period of at least MIN_PERIOD_FRAMES frames is detected after
+# DETECTION_CYCLES identical cycles in the digests of the last HISTORY_FRAMES frames, then a frame is computed
+# again every CHECK_INTERVAL frames to verify it
+MIN_PERIOD_FRAMES = 8
+DETECTION_CYCLES = 3
+HISTORY_FRAMES = 600
+CHECK_INTERVAL = 25
+
+
+def load_shader(path):
+    """Return the ShaderScript of a shader script: its shader function, its precompute function and its PERIOD.
+
+    precompute and period are None if the script does not define them.
+    """
+    module_name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if spec is None:
+        raise ImportError(f"Cannot load module from {path}")
+
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return ShaderScript(module.shader, getattr(module, 'precompute', None), getattr(module, 'PERIOD', None))
+
+
+def compute_fields(precompute, x, y, z):
+    """Return the fields computed by precompute(x, y, z) for all the coordinates, as a dict of arrays or scalars.
+
+    precompute is called with the arrays of coordinates; if it does not support arrays, it is called per pixel.
+    """
+    if precompute is None:
+        return {}
+    try:
+        return dict(precompute(x, y, z))
+    except (TypeError, ValueError):
+        fields = [precompute(*coords) for coords in zip(x, y, z)]
+        return {name: np.array([f[name] for f in fields]) for name in fields[0]} if fields else {}
+
+
+def per_pixel(shader):
+    """Return the shader vectorized: it is called with arrays, and calls the shader once per pixel.
+
+    numpy.frompyfunc is used instead of numpy.vectorize, which is twice slower with keyword arguments.
+    """
+    def vectorized(x, y, z, t, **fields):
+        names = list(fields)
+
+        def pixel(x, y, z, *values):
+            return shader(x, y, z, t, **dict(zip(names, values)))
+
+        return [c.astype(float) for c in np.frompyfunc(pixel, 3 + len(names), 3)(x, y, z, *fields.values())]
+    return vectorized
+
+
+def _tile(fields, start, stop):
+    return {name: value[start:stop] if np.ndim(value) else value for name, value in fields.items()}
+
+
+def _to_uint8(rgb):
+    # like the canvas: the colors are clipped then truncated
+    return np.clip(rgb * 255, 0, 255).astype(np.uint8)
+
+
+# State of a worker process, set by _init_worker()
+_worker = None
+
+
+def _init_worker(shader, precompute, panel_size, memory_name):
+    global _worker
+    if isinstance(shader, (str, os.PathLike)):
+        shader, script_precompute, _period = load_shader(shader)
+        precompute = precompute or script_precompute
+
+    # the workers share the resource tracker of the main process, which unlinks the memory in close()
+    memory = shared_memory.SharedMemory(name=memory_name)
+
+    coords = surface_coordinates(panel_size)
+    valid = np.flatnonzero(coords.valid)
+    xyz = (coords.x.ravel()[valid], coords.y.ravel()[valid], coords.z.ravel()[valid])
+    _worker = (per_pixel(shader),
+               xyz,
+               compute_fields(precompute, *xyz),
+               valid,
+               np.ndarray((coords.valid.size, 3), dtype=np.uint8, buffer=memory.buf),
+               memory)
+
+
+def _shade_tile(t, start, stop):
+    shader, coords, fields, valid, image, _memory = _worker
+    r, g, b = shader(*(c[start:stop] for c in coords), t, **_tile(fields, start, stop))
+    image[valid[start:stop]] = _to_uint8(np.stack(np.broadcast_arrays(r, g, b, valid[start:stop])[:3], axis=-1))
+
+
+class FrameCache:
+    """The frames rendered by a ShaderRunner, least recently used first, within a memory budget in bytes.
+
+    A frame is the uint8 (pixels, 3) array of the colors of the face pixels.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.__frames = OrderedDict()   # key: pixels
+
+    def __len__(self):
+        return len(self.__frames)
+
+    def get(self, key):
+        pixels = self.__frames.get(key)
+        if pixels is None:
+            self.misses += 1
+            return None
+        self.__frames.move_to_end(key)
+        self.hits += 1
+        return pixels
+
+    def put(self, key, pixels):
+        if pixels.nbytes > self.max_bytes:
+            return
+        self.__remove(key)
+        self.__frames[key] = pixels
+        self.bytes += pixels.nbytes
+        while self.bytes > self.max_bytes:
+            self.__remove(next(iter(self.__frames)))
+
+    def __remove(self, key):
+        pixels = self.__frames.pop(key, None)
+        if pixels is not None:
+            self.bytes -= pixels.nbytes
+
+
+class ShaderRunner:
+    """Draw a shader on all the pixels of the cube.
+
+    A shader is a function shader(x, y, z, t) that returns the (r, g, b) color, in the range 0..1, of the point
+    (x, y, z) of the surface of the cube at the time t. See mapper_matrix_to_cube for the coordinates.
+
+    The shader is called once per frame with arrays: x, y and z are the float32 coordinates of all the pixels of
+    the faces. It must return arrays, or scalars for the constant components. A shader written for scalars, which
+    raises TypeError (math functions) or ValueError (if on an array) when it is called with arrays, is vectorized
+    by per_pixel(): it still works, but it is called once per pixel.
+
+    The shader can also have fields that do not depend on the time, like angles or distances: precompute(x, y, z)
+    is called once with the coordinates of all the pixels, and returns a dict of named arrays. The fields are then
+    passed to the shader as keyword arguments, shader(x, y, z, t, **fields), for each frame. A shader script
+    defines them with a precompute function next to its shader function.
+
+    With workers > 0, a scalar shader is evaluated by a pool of processes, each one computing tiles of the pixels
+    and writing them to a framebuffer in shared memory. The shader is then given as the path of its script, or as
+    a function that can be pickled. close() must be called to stop the processes.
+
+    With cache_mb > 0, the frames are kept in a FrameCache of this size, in MB, and the frames that repeat are not
+    computed again:
+
+    - if the shader is periodic in t and its period is known (the period argument, or PERIOD in the script),
+      the frames are cached by their phase, t modulo the period, rounded to t_step: the step of t between the
+      frames. A frame can then be displayed up to t_step / 2 early or late, when the period is not a multiple
+      of t_step.
+    - otherwise, the runner keeps the digests of the last HISTORY_FRAMES frames computed, outside of the cache,
+      and looks for a period of n frames: the last DETECTION_CYCLES * n frames are DETECTION_CYCLES identical
+      cycles. n is at least MIN_PERIOD_FRAMES and the cycle is not a single frame held, so that a shader that
+      does not change for a while is not taken for periodic. The shader is then considered periodic, with the period of time of these n frames
+      (detected_period), and the next frames are read from the cache, which must hold one period. Every
+      CHECK_INTERVAL frames, a frame is still computed: if it differs from the cached one by more than the
+      rounding of the colors, the period is dropped.
+
+    The colors of all the pixels are written to the canvas with one Cube.blit().
+    """
+
+    def __init__(self, cube, shader, panel_size=PANEL, workers=0, precompute=None, cache_mb=0, period=None, t_step=1):
+        self.cube = cube
+        self.shader = shader
+        script_precompute = None
+        if isinstance(shader, (str, os.PathLike)):
+            self.shader, script_precompute, script_period = load_shader(shader)
+            period = period or script_period
+        self.per_pixel = False      # True if the shader is called per pixel, through per_pixel()
+        self.frames = 0
+        self.frame_time = 0.0       # time to compute and draw the last frame, in seconds
+        self.total_time = 0.0
+
+        self.__source = shader
+        self.__panel_size = panel_size
+        self.__workers = workers
+        self.__pool = None
+        self.__memory = None
+
+        coords = surface_coordinates(panel_size)
+        self.__valid = coords.valid
+        # only the pixels of the faces are computed
+        self.__coords = (coords.x[self.__valid], coords.y[self.__valid], coords.z[self.__valid])
+        self.__precompute = precompute     # given to the workers, which load the precompute function of a script
+        self.fields = compute_fields(precompute or script_precompute, *self.__coords)
+        self.__image = np.zeros(self.__valid.shape + (3,), dtype=np.uint8)
+
+        self.cache = FrameCache(int(cache_mb * 2**20)) if cache_mb > 0 else None
+        self.period = period
+        self.t_step = t_step
+        self.detected_period = None
+        self.__t0 = None            # time of the first frame of the detected cycle
+        self.__times = []           # times and digests of the last frames computed
+        self.__digests = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    @property
+    def average_frame_time(self):
+        return self.total_time / self.frames if self.frames else 0.0
+
+    def __start_workers(self):
+        self.__memory = shared_memory.SharedMemory(create=True, size=self.__image.nbytes)
+        self.__image = np.ndarray(self.__image.shape, dtype=np.uint8, buffer=self.__memory.buf)
+        self.__image.fill(0)
+        self.__pool = ProcessPoolExecutor(self.__workers, initializer=_init_worker,
+                                          initargs=(self.__source, self.__precompute, self.__panel_size,
+                                                    self.__memory.name))
+        # a few tiles per worker, so that the workers finish at about the same time
+        bounds = np.linspace(0, len(self.__coords[0]), 4 * self.__workers + 1).astype(int)
+        self.__tiles = list(zip(bounds[:-1], bounds[1:]))
+
+    def __shade(self, t):
+        if not self.per_pixel:
+            try:
+                return self.shader(*self.__coords, t, **self.fields)
+            except (TypeError, ValueError):
+                self.per_pixel = True
+                self.shader = per_pixel(self.shader)
+                if self.__workers:
+                    self.__start_workers()
+        if self.__pool:
+            futures = [self.__pool.submit(_shade_tile, t, start, stop) for start, stop in self.__tiles]
+            for future in futures:
+                future.result()
+            return None
+        return self.shader(*self.__coords, t, **self.fields)
+
+    def __render(self, t):
+        rgb = self.__shade(t)
+        if rgb is not None:
+            r, g, b = rgb
+            self.__image[self.__valid] = _to_uint8(np.stack(np.broadcast_arrays(r, g, b, self.__coords[0])[:3], axis=-1))
+        # else the workers have written the image
+
+    def __cache_key(self, t):
+        if self.period:
+            frames = max(round(self.period / self.t_step), 1)
+            return round((t % self.period) / self.t_step) % frames
+        if self.detected_period:
+            t0 = self.__t0
+            return round(t0 + (t - t0) % self.detected_period, 6)
+        return round(t, 6)
+
+    def __detect_period(self, t, digest):
+        times, digests = self.__times, self.__digests
+        times.append(t)
+        digests.append(digest)
+        if len(digests) > HISTORY_FRAMES:
+            del times[0], digests[0]
+
+        d = np.array(digests, dtype=np.uint32)
+        count = len(d)
+        last = count - 1
+        # the periods n for which the last frame is identical to the frame n frames before
+        periods = last - np.flatnonzero(d[:max(count - MIN_PERIOD_FRAMES, 0)] == digest)
+        periods = periods[DETECTION_CYCLES * periods <= count]
+        # then for which the previous frames repeat too, over DETECTION_CYCLES cycles
+        k = 1
+        while len(periods) and k < (DETECTION_CYCLES - 1) * periods.max():
+            repeats = d[last - k] == d[np.maximum(last - k - periods, 0)]
+            periods = periods[repeats | (k >= (DETECTION_CYCLES - 1) * periods)]
+            k += 1
+
+        for n in np.sort(periods):
+            if (d[count - n:] == digest).all():
+                continue    # a frame held for several cycles
+            period = times[-1] - times[-1 - n]
+            cycles = np.array(times[count - DETECTION_CYCLES * n:])
+            if np.allclose(cycles[n:] - cycles[:-n], period):
+                self.detected_period = period
+                self.__t0 = times[-n]
+                return
+
+    def __draw_cached(self, t):
+        key = self.__cache_key(t)
+        pixels = self.cache.get(key)
+        if pixels is not None:
+            if not self.detected_period or self.frames % CHECK_INTERVAL:
+                self.__image[self.__valid] = pixels
+                return
+            self.__render(t)
+            if np.abs(self.__image[self.__valid].astype(np.int16) - pixels).max() > 1:
+                # the shader is not periodic after all
+                self.detected_period = None
+                self.__times.clear()
+                self.__digests.clear()
+            return
+
+        self.__render(t)
+        pixels = self.__image[self.__valid]
+        if not self.period and not self.detected_period:
+            self.__detect_period(t, zlib.crc32(pixels))
+        self.cache.put(key, pixels)
+
+    def draw(self, t):
+        """Compute the frame at the time t, or get it from the cache, and draw it on the canvas.
+
+        The canvas is not refreshed.
+        """
+        start = time.perf_counter()
+
+        if self.cache is None:
+            self.__render(t)
+        else:
+            self.__draw_cached(t)
+        self.cube.blit(self.__image)
+
+        self.frame_time = time.perf_counter() - start
+        self.total_time += self.frame_time
+        self.frames += 1
+
+    def run(self, t=0, step=1):
+        """Draw and refresh the frames forever, t being incremented by step at each frame."""
+        while True:
+            self.draw(t)
+            self.cube.refresh()
+            t += step
+
+    def close(self):
+        """Stop the worker processes and free the shared memory."""
+        if self.__pool:
+            self.__pool.shutdown(cancel_futures=True)
+            self.__pool = None
+        if self.__memory:
+            self.__image = self.__image.copy()
+            self.__memory.close()
+            self.__memory.unlink()
+            self.__memory = None
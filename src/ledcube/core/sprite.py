@@ -0,0 +1,170 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+class Sprite:
+    """A pre-rendered image, drawn in one call with Plane.blit_sprite().
+
+    pixels is a (height, width, 4) array of RGBA values, indexed [y, x] in the plane coordinates: row 0 is the
+    bottom row of the sprite, like for Plane.blit(). The pixels with alpha 0 are not drawn. The others are
+    blended with the plane in the emulator; on the Pi, where the canvas can not be read, the pixels with
+    alpha >= 128 are drawn and the others are not.
+
+    The pixels of a sprite are read-only: a sprite can be shared, which is what the generators below do.
+    """
+
+    def __init__(self, pixels):
+        pixels = np.asarray(pixels)
+        if pixels.ndim != 3 or pixels.shape[2] not in (3, 4):
+            raise ValueError(f"Sprite pixels must be a (height, width, 3 or 4) array, not {pixels.shape}")
+        if pixels.shape[2] == 3:
+            pixels = np.concatenate((pixels, np.full(pixels.shape[:2] + (1,), 255)), axis=2)
+
+        self.pixels = np.clip(pixels, 0, 255).astype(np.uint8)
+        self.pixels.flags.writeable = False
+        self.opaque = bool((self.pixels[..., 3] == 255).all())
+
+    @property
+    def width(self):
+        return self.pixels.shape[1]
+
+    @property
+    def height(self):
+        return self.pixels.shape[0]
+
+    @property
+    def rgb(self):
+        return self.pixels[..., :3]
+
+    def rotated(self, quarter_turns=1):
+        """Return the sprite rotated counterclockwise by a multiple of 90°, to orient it on a face."""
+        return Sprite(np.rot90(self.pixels, quarter_turns))
+
+    @classmethod
+    def from_image(cls, image):
+        """Create a sprite from a PIL image. The top row of the image is the top row of the sprite."""
+        return cls(np.asarray(image.convert('RGBA'))[::-1])
+
+    @classmethod
+    def from_mask(cls, mask, color):
+        """Create a sprite of one color from a (height, width) boolean array indexed [y, x] like the pixels."""
+        mask = np.asarray(mask, dtype=bool)
+        pixels = np.zeros(mask.shape + (4,), dtype=np.uint8)
+        pixels[mask] = (*_rgb(color), 255)
+        return cls(pixels)
+
+
+def disk_lines(x0, y0, r):
+    """Return the vertical lines (x0, y0, x1, y1) that fill the disk of center (x0, y0) and radius r.
+
+    https://github.com/adafruit/Adafruit-GFX-Library/blob/master/Adafruit_GFX.cpp#L471
+    """
+    if r <= 0:
+        return []
+
+    if r == 1:
+        return [(x0, y0, x0, y0)]
+
+    f = 1 - r
+    dd_f_x = 1
+    dd_f_y = -2 * r
+    x = 0
+    y = r
+    px = x
+    py = y
+
+    lines = []
+    while x < y:
+        if f >= 0:
+            y -= 1
+            dd_f_y += 2
+            f += dd_f_y
+
+        x += 1
+        dd_f_x += 2
+        f += dd_f_x
+
+        lines.append((x0, y0 - y, x0, y0 - y + 2 * y))
+
+        if x <= (y + 1):
+            lines.append((x0 + x, y0 - y, x0 + x, y0 - y + 2 * y))
+            lines.append((x0 - x, y0 - y, x0 - x, y0 - y + 2 * y))
+
+        if y != py:
+            lines.append((x0 + py, y0 - px, x0 + py, y0 - px + 2 * px))
+            lines.append((x0 - py, y0 - px, x0 - py, y0 - px + 2 * px))
+            py = y
+
+        px = x
+
+    return lines
+
+
+def circle_points(r):
+    """Return the (x, y) offsets of the points of the circle of radius r from its center.
+
+    Same Bresenham algorithm as the DrawCircle of the emulator.
+    """
+    points = []
+    c = 0
+    d = 3 - 2 * r
+    while r >= c:
+        points.extend([(r, c), (-r, c), (r, -c), (-r, -c), (c, r), (-c, r), (c, -r), (-c, -r)])
+        if d < 0:
+            d += 4 * c + 6
+        else:
+            d += 4 * (c - r) + 10
+            r -= 1
+        c += 1
+    return points
+
+
+def _rgb(color):
+    # the colors are converted to tuples to be used as cache keys: two Color objects are never equal
+    if hasattr(color, 'red'):
+        return int(color.red), int(color.green), int(color.blue)
+    return tuple(int(c) for c in color)
+
+
+def dot(radius, color, border_color=None):
+    """Return a sprite of a filled circle, like Plane.fill_circle(), with an optional one pixel border.
+
+    The sprite is (2 * radius + 1) pixels wide; its center is at (radius, radius).
+    """
+    return _dot(int(radius), _rgb(color), None if border_color is None else _rgb(border_color))
+
+
+def rounded_square(size, color):
+    """Return a sprite of a square of the given size without its four corner pixels."""
+    return _rounded_square(int(size), _rgb(color))
+
+
+def rectangle(width, height, color):
+    """Return a sprite of an opaque rectangle."""
+    return _rectangle(int(width), int(height), _rgb(color))
+
+
+@lru_cache(maxsize=256)
+def _dot(radius, rgb, border_rgb):
+    size = 2 * max(radius, 0) + 1
+    pixels = np.zeros((size, size, 4), dtype=np.uint8)
+    for x, y_from, _x, y_to in disk_lines(radius, radius, radius):
+        pixels[y_from:y_to + 1, x] = (*rgb, 255)
+    if border_rgb is not None:
+        for x, y in circle_points(radius):
+            pixels[radius + y, radius + x] = (*border_rgb, 255)
+    return Sprite(pixels)
+
+
+@lru_cache(maxsize=256)
+def _rounded_square(size, rgb):
+    pixels = np.zeros((size, size, 4), dtype=np.uint8)
+    pixels[...] = (*rgb, 255)
+    pixels[[0, 0, -1, -1], [0, -1, 0, -1], 3] = 0
+    return Sprite(pixels)
+
+
+@lru_cache(maxsize=256)
+def _rectangle(width, height, rgb):
+    return Sprite(np.broadcast_to(np.array((*rgb, 255)), (height, width, 4)))
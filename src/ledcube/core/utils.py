@@ -1,4 +1,5 @@
 import math
+from functools import lru_cache
 from importlib.resources import files
 from math import atan2, sqrt, pi
 
@@ -166,7 +167,9 @@ def clamp(n, min, max):
         return n
 
 
+@lru_cache(maxsize=None)
 def load_font(font_filename):
+    """Load a font of ledcube/data/fonts. The fonts are loaded once per process and shared."""
     font = rgb_graphics.Font()
     # LoadFont argument must be a path (string). This can not be a file.
     font.LoadFont(str(files('ledcube.data.fonts').joinpath(font_filename)))
@@ -1,5 +1,6 @@
-import importlib, json
+import importlib
 
+from ledcube.emulator.config import load_config
 from ledcube.emulator.logger import Logger
 
 adapters = [
@@ -19,55 +20,57 @@ adapters = [
         'type': 'pygame'
     },
     {
-        'path': 'ledcube.emulator.adapters.sixel_adapter',
-        'class': 'SixelAdapter',
-        'type': 'sixel'
+        'path': 'ledcube.emulator.adapters.null_adapter',
+        'class': 'NullAdapter',
+        'type': 'null'
     },
     {
-        'path': 'ledcube.emulator.adapters.terminal_adapter',
-        'class': 'TerminalAdapter',
-        'type': 'terminal'
-    },
-    {
-        'path': 'ledcube.emulator.adapters.tkinter_adapter',
-        'class': 'TkinterAdapter',
-        'type': 'tkinter'
-    },
-    {
-        'path': 'ledcube.emulator.adapters.turtle_adapter',
-        'class': 'TurtleAdapter',
-        'type': 'turtle'
+        'path': 'ledcube.emulator.adapters.recorder_adapter',
+        'class': 'RecorderAdapter',
+        'type': 'recorder'
     }
 ]
 
+ADAPTER_NAMES = [adapter['type'] for adapter in adapters]
+
+# The adapters loaded so far. The adapters are imported by load_adapter(), when they are used.
 ADAPTER_TYPES = {}
 
-try:
-    with open("emulator_config.json") as config_file:
-        suppress_adapter_load_errors = json.load(config_file).get("suppress_adapter_load_errors", False)
-except:
-    suppress_adapter_load_errors = False
 
-for adapter in adapters:
+def load_adapter(adapter_name):
+    '''
+    Imports the display adapter and returns its class, or None if there is no such adapter or if it failed to load.
+    '''
+    if adapter_name in ADAPTER_TYPES:
+        return ADAPTER_TYPES[adapter_name]
+
+    adapter = next((adapter for adapter in adapters if adapter['type'] == adapter_name), None)
+    if adapter is None:
+        return None
+
     package_path = adapter.get('path')
     adapter_class = adapter.get('class')
-    adapter_name = adapter.get('type')
     try:
         package = importlib.import_module(package_path)
-        adapter = getattr(package, adapter_class)
+        ADAPTER_TYPES[adapter_name] = getattr(package, adapter_class)
+    except Exception:
+        try:
+            suppress_adapter_load_errors = (load_config() or {}).get("suppress_adapter_load_errors", False)
+        except Exception:
+            suppress_adapter_load_errors = False
 
-        ADAPTER_TYPES[adapter_name] = adapter
-    except Exception as ex:
-        if suppress_adapter_load_errors: continue
-
-        Logger.exception(f'''
+        if not suppress_adapter_load_errors:
+            Logger.exception(f'''
 Failed to load {adapter_class} for "{adapter_name}" display adapter!
 
-If this is not your configured display adapter, the emulator will continue to load.
+Check that you have installed dependencies required for this adapter.
 
 You can suppress this error in the `emulator_config.json` by adding:
 
   "suppress_adapter_load_errors": true
 
 '''
-        )
+            )
+        return None
+
+    return ADAPTER_TYPES[adapter_name]
@@ -1,10 +1,27 @@
+from functools import lru_cache
+
+import numpy as np
+
 from ledcube.emulator import version
+from ledcube.emulator.adapters.mapper import remap
+
+
+@lru_cache(maxsize=8)
+def brightness_table(brightness):
+    '''
+    Returns the 256 entries lookup table mapping a color value to its value at the given brightness (0..100).
+    '''
+    alpha = min(max(brightness, 0), 100) / 100.0
+    table = (np.arange(256) * alpha).astype(np.uint8)
+    table.flags.writeable = False
+    return table
 
 
 class BaseAdapter:
 
     SUPPORTS_ALTERNATE_PIXEL_STYLE = False
     INSTANCE = None
+    PIXEL_LAYOUT = None     # name of the unfolded layout of the cube, in mapper.LAYOUTS, if the adapter uses one
 
     def __init__(self, width, height, options):
         self.width   = width
@@ -15,15 +32,32 @@ class BaseAdapter:
 
     @classmethod
     def get_instance(cls, *args, **kwargs):
-        if cls.INSTANCE is None:
+        # look in the class itself, not in its parents: each adapter class has its own instance
+        if cls.__dict__.get('INSTANCE') is None:
             instance = cls(*args, **kwargs)
             cls.INSTANCE = instance
         
         return cls.INSTANCE
 
-    def adjust_pixel_brightness(self, pixel, to_int = False):
-        alpha = self.options.brightness / 100.0
-        pixel.adjust_brightness(alpha, to_int = to_int)
+    def adjust_brightness(self, pixels):
+        '''
+        Returns the frame with the brightness applied, in one pass over the frame.
+
+        The canvas frame is not modified: a new array is returned, or the frame itself if the brightness is 100.
+        '''
+        if self.options.brightness >= 100:
+            return pixels
+
+        return brightness_table(self.options.brightness)[pixels]
+
+    def map_pixels(self, pixels):
+        '''
+        Returns the frame as it must be displayed, in the PIXEL_LAYOUT of the adapter if any.
+        '''
+        if self.PIXEL_LAYOUT is None:
+            return pixels
+
+        return remap(pixels, self.PIXEL_LAYOUT, self.options.rows)
 
     def pixel_out_of_bounds(self, x, y):
         if x < 0 or x >= self.width:
@@ -63,9 +97,9 @@ class BaseAdapter:
 
     def draw_to_screen(self, _pixels):
         '''
-        Accepts a 2D array of pixels of size height x width.
+        Accepts the frame buffer of the canvas, a (height x width x 3) uint8 numpy array. The array must not be modified.
 
         Implements drawing each pixel to the screen via the external dependency loaded in load_emulator_window.
-        Before drawing, use adjust_pixel_brightness() on each pixel if your display adapter supports it.
+        Before drawing, use adjust_brightness() on the frame if your display adapter supports it.
         '''
         raise NotImplementedError
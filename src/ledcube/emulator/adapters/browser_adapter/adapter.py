@@ -1,10 +1,12 @@
 import io
-
-from PIL import Image, ImageDraw
+import zlib
 
 from ledcube.emulator.adapters.base import BaseAdapter
+from ledcube.emulator.adapters.browser_adapter import protocol
+from ledcube.emulator.adapters.browser_adapter.encoder import FrameEncoder
 from ledcube.emulator.adapters.browser_adapter.server import Server
 from ledcube.emulator.adapters.browser_adapter.web_socket import ImageWebSocket
+from ledcube.emulator.adapters.upscale import upscale
 from ledcube.emulator.logger import Logger
 
 
@@ -15,7 +17,21 @@ class BrowserAdapter(BaseAdapter):
     def __init__(self, width, height, options):
         super().__init__(width, height, options)
         self.__server = None
+        self.__frame = None
+        self.__fingerprint = None
+        self.__previous = None     # previous frame sent with the delta protocol
+        self.encoder = FrameEncoder(self.encode_frame, options.browser.target_fps)
         self.image = None
+        self.encoded_frame = None
+
+        self.encode_hits = 0       # frames identical to the previous one, not encoded again
+        self.encode_misses = 0     # new frames, handed over to the encoder
+
+        self.protocol = options.browser.protocol.lower()
+        if self.protocol not in protocol.PROTOCOLS:
+            protocols = ', '.join('"{}"'.format(name) for name in protocol.PROTOCOLS)
+            Logger.warning('"{}" browser protocol option not recognized. Valid options are {}. Defaulting to "jpeg"...'.format(options.browser.protocol, protocols))
+            self.protocol = 'jpeg'
 
     def load_emulator_window(self):
         if self.loaded:
@@ -31,40 +47,60 @@ class BrowserAdapter(BaseAdapter):
         self.loaded = True
 
     def draw_to_screen(self, pixels):
-        image = Image.new("RGB", self.options.window_size())
-        drawer = ImageDraw.Draw(image)
-        pixel_size = self.options.pixel_size
-        for row, pixel_row in enumerate(pixels):
-            for col, pixel in enumerate(pixel_row):
-                self.__draw_pixel(drawer, col * pixel_size, row * pixel_size, pixel)
-
-        with io.BytesIO() as bytesIO:
-            image.save(
-                bytesIO, "JPEG", quality=self.options.browser.quality, optimize=True
-            )
-            self.image = bytesIO.getvalue()
-
-    def __draw_pixel(self, image: ImageDraw, x, y, pixel):
-        self.adjust_pixel_brightness(pixel)
-        pixel_size = self.options.pixel_size
-        if self.options.pixel_style == "circle":
-            image.ellipse(
-                (x, y, x + pixel_size - 1, y + pixel_size - 1),
-                fill=pixel.to_tuple(),
-                outline=pixel.to_tuple(),
-            )
+        # Many scenes present the same frame again and again: the image already encoded is kept.
+        fingerprint = (zlib.crc32(pixels), self.options.brightness)
+        if fingerprint == self.__fingerprint:
+            self.encode_hits += 1
+            return
+
+        self.encode_misses += 1
+        self.__fingerprint = fingerprint
+
+        # The image is built and encoded by the encoder thread; we only keep a copy of the frame.
+        self.__frame = pixels.copy()
+        if ImageWebSocket.clients:
+            self.encoder.submit(self.__frame)
+
+    def client_connected(self):
+        '''
+        Called when a browser connects. The frames are not encoded when no browser is connected,
+        so the last frame has to be encoded now.
+        '''
+        if self.__frame is not None:
+            self.encoder.submit(self.__frame)
+
+    def encode_frame(self, pixels):
+        delta = None
+
+        if self.protocol == 'jpeg':
+            image = self.render_image(pixels)
+
+            with io.BytesIO() as bytesIO:
+                image.save(
+                    bytesIO, "JPEG", quality=self.options.browser.quality, optimize=True
+                )
+                image = bytesIO.getvalue()
         else:
-            image.rectangle(
-                (x, y, x + pixel_size, y + pixel_size),
-                fill=pixel.to_tuple(),
-                outline=pixel.to_tuple(),
-            )
+            # unscaled frame; the browser does the upscaling
+            frame = self.adjust_brightness(self.map_pixels(pixels))
+            image = protocol.key_frame(frame)
+            if self.protocol == 'delta':
+                if self.__previous is not None and self.__previous.shape == frame.shape:
+                    delta = protocol.delta(frame, self.__previous)
+                self.__previous = frame
+
+        sequence = self.encoded_frame.sequence + 1 if self.encoded_frame else 0
+        self.encoded_frame = protocol.EncodedFrame(sequence, image, delta)
+        self.image = image
+
+        ImageWebSocket.image_encoded()
 
     def draw_to_file(self, pixels, filepath):
-        image = Image.new("RGB", self.options.window_size())
-        drawer = ImageDraw.Draw(image)
-        pixel_size = self.options.pixel_size
-        for row, pixel_row in enumerate(pixels):
-            for col, pixel in enumerate(pixel_row):
-                self.__draw_pixel(drawer, col * pixel_size, row * pixel_size, pixel)
-        image.save(filepath)
+        self.render_image(pixels).save(filepath)
+
+    def render_image(self, pixels):
+        '''
+        Builds the upscaled image of the frame in one step from the frame array.
+        '''
+        frame = self.adjust_brightness(self.map_pixels(pixels))
+        return upscale(frame, self.options.pixel_size, self.options.pixel_style)
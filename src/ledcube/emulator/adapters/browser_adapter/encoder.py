@@ -0,0 +1,56 @@
+import threading
+import time
+
+from ledcube.emulator.logger import Logger
+
+
+class FrameEncoder:
+    '''
+    Encodes the frames in a background thread, so that the render loop never waits for the encoder.
+
+    Only the latest submitted frame is kept: when a new frame is submitted before the previous one
+    has been encoded, the previous one is dropped.
+    '''
+
+    def __init__(self, encode, max_fps=None):
+        self.encode = encode    # function called with the frame, in the encoder thread
+        self.min_interval = 1.0 / max_fps if max_fps else 0
+
+        self.encoded = 0        # number of frames encoded
+        self.dropped = 0        # number of frames replaced by a newer one before being encoded
+
+        self.__frame = None
+        self.__condition = threading.Condition()
+        self.__thread = threading.Thread(target=self.__run, name="RGBMEEncoderThread", daemon=True)
+        self.__thread.start()
+
+    def submit(self, frame):
+        '''
+        Hands a frame over to the encoder thread. The frame must not be modified afterwards.
+        '''
+        with self.__condition:
+            if self.__frame is not None:
+                self.dropped += 1
+            self.__frame = frame
+            self.__condition.notify()
+
+    def __run(self):
+        next_time = 0
+        while True:
+            # Wait before taking the next frame; the frames submitted meanwhile replace each other.
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self.__condition:
+                while self.__frame is None:
+                    self.__condition.wait()
+                frame = self.__frame
+                self.__frame = None
+
+            next_time = time.monotonic() + self.min_interval
+            try:
+                self.encode(frame)
+                self.encoded += 1
+            except Exception:
+                Logger.exception("Failed to encode the frame")
@@ -0,0 +1,46 @@
+'''
+Binary frame protocol of the browser adapters.
+
+With the "jpeg" protocol, the messages are the JPEG images of the upscaled frames, as before.
+
+With the "raw" and "delta" protocols, the messages contain the unscaled RGB pixels of the frame and
+the browser draws them in a <canvas> and does the upscaling itself:
+
+    offset  size
+    0       1       message type: 'K' (key frame) or 'D' (delta)
+    1       2       frame width, unsigned, little-endian
+    3       2       frame height, unsigned, little-endian
+    5       ...     zlib compressed payload: width * height * 3 bytes, RGB, row by row
+
+The payload of a key frame is the frame. The payload of a delta is the frame XOR the previous frame sent
+to the same client, which is mostly zeros and compresses very well. A delta is sent only when the client
+got the previous frame, otherwise it gets a key frame.
+'''
+import struct
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+PROTOCOLS = ['jpeg', 'raw', 'delta']
+
+KEY_FRAME = b'K'
+DELTA = b'D'
+
+HEADER = struct.Struct('<cHH')
+
+COMPRESSION_LEVEL = 1   # the payloads are mostly zeros, a higher level costs more CPU for almost no gain
+
+# An encoded frame. image is the JPEG image or the key frame, delta is the delta with the frame of the
+# previous sequence number or None.
+EncodedFrame = namedtuple('EncodedFrame', ['sequence', 'image', 'delta'])
+
+
+def key_frame(frame):
+    height, width = frame.shape[:2]
+    return HEADER.pack(KEY_FRAME, width, height) + zlib.compress(np.ascontiguousarray(frame).data, COMPRESSION_LEVEL)
+
+
+def delta(frame, previous):
+    height, width = frame.shape[:2]
+    return HEADER.pack(DELTA, width, height) + zlib.compress(np.bitwise_xor(frame, previous).data, COMPRESSION_LEVEL)
@@ -5,6 +5,14 @@ function init() {
     let img       = document.getElementById("liveImg");
     let fpsText   = document.getElementById("fps");
     let fpsTarget = parseInt(document.getElementById("targetFps").value) || FPS_DEFAULT;
+    let push      = document.getElementById("push").value === "true";    // the server sends the images itself
+    let protocol  = document.getElementById("protocol").value;
+    let pixelSize = parseInt(document.getElementById("pixelSize").value) || 1;
+
+    // With the "raw" and "delta" protocols, the frames are drawn in a canvas, unscaled, and the browser upscales them.
+    let context   = (protocol === "jpeg") ? null : img.getContext("2d");
+    let frame     = null;                // last frame, RGBA
+    let decoding  = Promise.resolve();   // the frames are decoded in order, a delta applies to the previous frame
 
     let requestStartTime = performance.now();
     let startTime = performance.now();
@@ -16,6 +24,49 @@ function init() {
 
     let socket = generateSocket();
 
+    async function inflate(data) {
+        let stream = new Blob([data]).stream().pipeThrough(new DecompressionStream("deflate"));
+        return new Uint8Array(await new Response(stream).arrayBuffer());
+    }
+
+    async function drawFrame(arrayBuffer) {
+        // 'K' (key frame) or 'D' (delta), width and height (uint16, little-endian), zlib compressed RGB pixels
+        let view   = new DataView(arrayBuffer);
+        let type   = String.fromCharCode(view.getUint8(0));
+        let width  = view.getUint16(1, true);
+        let height = view.getUint16(3, true);
+        let rgb    = await inflate(new Uint8Array(arrayBuffer, 5));
+
+        if (!frame || frame.width !== width || frame.height !== height) {
+            if (type === "D") {
+                return;
+            }
+            frame = new ImageData(width, height);
+            img.width  = width;
+            img.height = height;
+            img.style.width  = (width * pixelSize) + "px";
+            img.style.height = (height * pixelSize) + "px";
+        }
+
+        let pixels = frame.data;
+        if (type === "K") {
+            for (let i = 0, j = 0; i < rgb.length; i += 3, j += 4) {
+                pixels[j]     = rgb[i];
+                pixels[j + 1] = rgb[i + 1];
+                pixels[j + 2] = rgb[i + 2];
+                pixels[j + 3] = 255;
+            }
+        } else {
+            for (let i = 0, j = 0; i < rgb.length; i += 3, j += 4) {
+                pixels[j]     ^= rgb[i];
+                pixels[j + 1] ^= rgb[i + 1];
+                pixels[j + 2] ^= rgb[i + 2];
+            }
+        }
+
+        context.putImageData(frame, 0, 0);
+    }
+
     function requestImage() {
         requestStartTime = performance.now();
         socket.send('more');
@@ -40,7 +91,9 @@ function init() {
         ws.onopen = function() {
             console.log("RGBME WebSocket connection established!");
             startTime = performance.now();
-            requestImage();
+            if (!push) {
+                requestImage();
+            }
         };
 
         ws.onclose = function() {
@@ -58,10 +111,14 @@ function init() {
 
         ws.onmessage = function(evt) {
             let arrayBuffer = evt.data;
-            let blob  = new Blob([new Uint8Array(arrayBuffer)], {type: "image/jpeg"});
-            let old_img = img.src.slice()
-            img.src   = window.URL.createObjectURL(blob);
-            window.URL.revokeObjectURL(old_img);
+            if (context) {
+                decoding = decoding.then(() => drawFrame(arrayBuffer)).catch(console.error);
+            } else {
+                let blob  = new Blob([new Uint8Array(arrayBuffer)], {type: "image/jpeg"});
+                let old_img = img.src.slice()
+                img.src   = window.URL.createObjectURL(blob);
+                window.URL.revokeObjectURL(old_img);
+            }
 
             let endTime = performance.now();
             let currentTime = endTime - startTime;
@@ -74,6 +131,10 @@ function init() {
                 fpsText.textContent = fps;
             }
 
+            if (push) {
+                return;
+            }
+
             let currentRequestTime = performance.now() - requestStartTime;
             // smooth with moving average
             requestTime = (requestTime * requestTimeSmoothing) + (currentRequestTime * (1.0 - requestTimeSmoothing));
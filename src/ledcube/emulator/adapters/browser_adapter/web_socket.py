@@ -1,3 +1,4 @@
+import tornado.ioloop
 import tornado.websocket
 
 from ledcube.emulator.logger import Logger
@@ -6,25 +7,96 @@ from ledcube.emulator.logger import Logger
 class ImageWebSocket(tornado.websocket.WebSocketHandler):
     clients = set()
     adapter = None
+    io_loop = None
 
     def check_origin(self, _origin):
         # Allow access from every origin
         return True
 
     def open(self):
+        ImageWebSocket.io_loop = tornado.ioloop.IOLoop.current()
         ImageWebSocket.clients.add(self)
+        self.sequence = -1      # sequence number of the last frame sent to this client
+        self.waiting = False
+        self.pending = False    # one-slot outgoing queue, for the push mode
+        self.sending = False
+        self.skipped = 0
         Logger.info("WebSocket opened from: " + self.request.remote_ip)
+        ImageWebSocket.adapter.client_connected()
 
     def on_message(self, _message):
-        if not ImageWebSocket.adapter.image:
-            Logger.warning("No image received from {}!".format(ImageWebSocket.adapter.__class__.__name__))
+        if ImageWebSocket.adapter.options.browser.push:
+            # the client does not have to ask for the images in push mode
             return
 
-        jpeg_bytes = ImageWebSocket.adapter.image
-        self.write_message(jpeg_bytes, binary=True)
+        if not self.has_new_frame():
+            # The image is sent as soon as a new frame is encoded
+            self.waiting = True
+            return
+
+        self.send_image()
 
     def on_close(self):
         ImageWebSocket.clients.remove(self)
 
+    def has_new_frame(self):
+        encoded_frame = ImageWebSocket.adapter.encoded_frame
+        return encoded_frame is not None and encoded_frame.sequence != self.sequence
+
+    def next_message(self):
+        '''
+        Returns the message for the latest encoded frame: the delta with the previous frame if
+        this client got the previous frame, the full image otherwise.
+        '''
+        encoded_frame = ImageWebSocket.adapter.encoded_frame
+        if encoded_frame.delta is not None and self.sequence == encoded_frame.sequence - 1:
+            message = encoded_frame.delta
+        else:
+            message = encoded_frame.image
+        self.sequence = encoded_frame.sequence
+        return message
+
+    def send_image(self):
+        self.waiting = False
+        self.write_message(self.next_message(), binary=True)
+
+    def push_image(self):
+        '''
+        Queues the latest image for this client. If the previous image has not been sent yet, it is replaced:
+        a slow client skips frames but does not delay the other clients.
+        '''
+        if self.pending:
+            self.skipped += 1
+        self.pending = True
+
+        if not self.sending:
+            self.sending = True
+            ImageWebSocket.io_loop.spawn_callback(self.__flush)
+
+    async def __flush(self):
+        try:
+            while self.pending:
+                self.pending = False
+                await self.write_message(self.next_message(), binary=True)
+        except tornado.websocket.WebSocketClosedError:
+            pass
+        finally:
+            self.sending = False
+
     def register_adapter(adapter):
         ImageWebSocket.adapter = adapter
+
+    def image_encoded():
+        '''
+        Called by the encoder thread each time a new image is available.
+        '''
+        if ImageWebSocket.io_loop is not None:
+            ImageWebSocket.io_loop.add_callback(ImageWebSocket.__image_encoded)
+
+    def __image_encoded():
+        push = ImageWebSocket.adapter.options.browser.push
+        for client in ImageWebSocket.clients:
+            if push:
+                client.push_image()
+            elif client.waiting:
+                client.send_image()
@@ -1,3 +1,23 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Unfolded layouts of the cube, described as data.
+#
+# Each entry maps a panel of the logical canvas to the place where it is displayed by the emulator.
+# The positions are (column, row) in panels, not in pixels.
+LAYOUTS = {
+    # see pixel_mapper() below
+    'cross': (
+        ((0, 0), (1, 1)),   # Front
+        ((1, 0), (2, 1)),   # Right
+        ((2, 0), (3, 1)),   # Back
+        ((3, 0), (0, 1)),   # Left
+        ((0, 1), (1, 0)),   # Top
+        ((1, 1), (1, 2)),   # Bottom
+    ),
+}
+
 
 def pixel_mapper(x, y):
     """
@@ -47,3 +67,44 @@ def pixel_mapper(x, y):
         else:
             return x+64, y+64   # Front
 
+
+@lru_cache(maxsize=8)
+def pixel_index(width, height, panel_size=64, layout='cross'):
+    """
+    Compile a layout into a gather index for a canvas of width x height pixels.
+
+    Returns a flat array of height * width integers: for each display pixel, the (flat) index of the
+    logical pixel displayed there, or -1 if no logical pixel is displayed there.
+
+    Like with pixel_mapper(), the logical pixels which are not on a cube face are mapped to (0, 0).
+    When several logical pixels are mapped to the same display pixel, the last one wins.
+    """
+    ys, xs = np.divmod(np.arange(width * height), width)
+
+    # by default, the non cube pixels are mapped to (0, 0)
+    display_xs = np.zeros_like(xs)
+    display_ys = np.zeros_like(ys)
+    for (col, row), (display_col, display_row) in LAYOUTS[layout]:
+        inside = (xs // panel_size == col) & (ys // panel_size == row)
+        display_xs[inside] = xs[inside] + (display_col - col) * panel_size
+        display_ys[inside] = ys[inside] + (display_row - row) * panel_size
+
+    visible = (display_xs < width) & (display_ys < height)
+    index = np.full(width * height, -1, dtype=np.intp)
+    # the logical pixels are processed in order, so the last one wins is the one with the highest index
+    np.maximum.at(index, display_ys[visible] * width + display_xs[visible], np.flatnonzero(visible))
+
+    index.flags.writeable = False
+    return index
+
+
+def remap(pixels, layout='cross', panel_size=64):
+    """
+    Remap a whole (height, width, 3) frame from the logical to the display coordinates with one fancy-index operation.
+    """
+    height, width = pixels.shape[:2]
+    index = pixel_index(width, height, panel_size, layout)
+
+    display = pixels.reshape(-1, 3)[index]
+    display[index < 0] = 0
+    return display.reshape(height, width, 3)
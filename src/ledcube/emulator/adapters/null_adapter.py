@@ -0,0 +1,24 @@
+from ledcube.emulator.adapters.base import BaseAdapter
+from ledcube.emulator.logger import Logger
+
+
+class NullAdapter(BaseAdapter):
+    '''
+    Headless adapter that displays nothing: the frames are only counted.
+
+    Use it to measure the rendering speed of the apps without the cost of a display, or to run them in CI.
+    '''
+
+    def __init__(self, width, height, options):
+        super().__init__(width, height, options)
+        self.frames = 0     # number of frames drawn
+
+    def load_emulator_window(self):
+        if self.loaded:
+            return
+
+        Logger.info('Loading {}'.format(self.emulator_details_text()))
+        self.loaded = True
+
+    def draw_to_screen(self, _pixels):
+        self.frames += 1
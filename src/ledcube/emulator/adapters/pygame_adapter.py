@@ -1,28 +1,31 @@
 import os
 import sys
 
-from ledcube.emulator.adapters.mapper import pixel_mapper
-
 # Try to suppress the pygame load warning if able.
 try:
     os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 except Exception:
     pass
 
+import numpy as np
 import pygame
 
 from pygame.locals import QUIT
 from ledcube.emulator.adapters.base import BaseAdapter
+from ledcube.emulator.adapters.upscale import pixel_mask
 from ledcube.emulator.logger import Logger
 
 
 class PygameAdapter(BaseAdapter):
 
     SUPPORTS_ALTERNATE_PIXEL_STYLE = True
+    PIXEL_LAYOUT = 'cross'
 
     def __init__(self, width, height, options):
         super().__init__(width, height, options)
         self.__surface = None
+        self.__frame_surface = None     # the frame, one pixel per LED
+        self.__overlay = None           # black outside the LEDs, for the "circle" style
 
     def load_emulator_window(self):
         if self.loaded:
@@ -38,11 +41,21 @@ class PygameAdapter(BaseAdapter):
         self.loaded = True
 
     def draw_to_screen(self, pixels):
-        for row, pixel_row in enumerate(pixels):
-            for col, pixel in enumerate(pixel_row):
-                x, y = pixel_mapper(col, row)
-                self.__draw_pixel(pixel, x, y)
-                # self.__draw_pixel(pixel, col, row)
+        pixels = self.adjust_brightness(self.map_pixels(pixels))
+        height, width = pixels.shape[:2]
+
+        if self.__frame_surface is None or self.__frame_surface.get_size() != (width, height):
+            self.__frame_surface = pygame.Surface((width, height))
+            self.__overlay = None
+
+        # surfarray arrays are indexed [x, y]
+        pygame.surfarray.blit_array(self.__frame_surface, pixels.swapaxes(0, 1))
+        pygame.transform.scale(self.__frame_surface, self.__surface.get_size(), self.__surface)
+
+        if self.options.pixel_style == 'circle' and self.options.pixel_size > 2:
+            if self.__overlay is None:
+                self.__overlay = self.__circle_overlay(width, height)
+            self.__surface.blit(self.__overlay, (0, 0))
 
         pygame.display.flip()
 
@@ -61,21 +74,17 @@ class PygameAdapter(BaseAdapter):
 
         pygame.display.set_icon(icon)
 
-    def __pygame_pixel(self, col, row):
-        return pygame.Rect(
-            col * self.options.pixel_size,
-            row * self.options.pixel_size,
-            self.options.pixel_size,
-            self.options.pixel_size
-        )
-
-    def __draw_pixel(self, pixel, x, y):
-        self.adjust_pixel_brightness(pixel)
-        pixel_rect = self.__pygame_pixel(x, y)
-        if self.options.pixel_style == 'circle':
-            radius = int(pixel_rect.width / 2)
-            center_x = pixel_rect.x + radius
-            center_y = pixel_rect.y + radius
-            pygame.draw.circle(self.__surface, pixel.to_tuple(), (center_x, center_y), radius)
-        else:
-            pygame.draw.rect(self.__surface, pixel.to_tuple(), pixel_rect)
+    def __circle_overlay(self, width, height):
+        '''
+        Returns a surface, the size of the window, that is black outside of the LEDs and transparent inside.
+        '''
+        pixel_size = self.options.pixel_size
+        overlay = pygame.Surface((width * pixel_size, height * pixel_size), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 255))
+
+        inside = np.tile(pixel_mask(pixel_size, 'circle'), (height, width))
+        alpha = pygame.surfarray.pixels_alpha(overlay)
+        alpha[inside.T] = 0
+        del alpha   # unlocks the surface
+
+        return overlay
@@ -0,0 +1,53 @@
+import numpy as np
+
+from ledcube.emulator.adapters.base import BaseAdapter
+from ledcube.emulator.logger import Logger
+
+
+class RecorderAdapter(BaseAdapter):
+    '''
+    Headless adapter that keeps the last frames in memory.
+
+    The frames are copied, as drawn on the canvas (not remapped, brightness not applied), in a ring buffer
+    of recorder.frames frames allocated once.
+    '''
+
+    def __init__(self, width, height, options):
+        super().__init__(width, height, options)
+        self.capacity = max(int(options.recorder.frames), 1)
+        self.count = 0      # number of frames drawn since the start
+
+        self.__buffer = np.empty((self.capacity, height, width, 3), dtype=np.uint8)
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def load_emulator_window(self):
+        if self.loaded:
+            return
+
+        Logger.info('Loading {} | {} frames'.format(self.emulator_details_text(), self.capacity))
+        self.loaded = True
+
+    def draw_to_screen(self, pixels):
+        self.__buffer[self.count % self.capacity] = pixels
+        self.count += 1
+
+    def last_frame(self):
+        '''
+        Returns the last frame drawn, or None. This is not a copy: it is overwritten after capacity frames.
+        '''
+        if self.count == 0:
+            return None
+
+        return self.__buffer[(self.count - 1) % self.capacity]
+
+    def frames(self):
+        '''
+        Returns a copy of the recorded frames, oldest first, as a (frames, height, width, 3) array.
+        '''
+        indexes = np.arange(self.count - len(self), self.count) % self.capacity
+        return self.__buffer[indexes]
+
+    def clear(self):
+        self.count = 0
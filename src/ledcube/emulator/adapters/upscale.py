@@ -0,0 +1,50 @@
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+
+@lru_cache(maxsize=8)
+def pixel_mask(pixel_size, pixel_style):
+    '''
+    Returns the (pixel_size x pixel_size) boolean mask of the LED shape.
+
+    The circle is drawn with PIL so that it looks the same as the ellipses the browser adapters were drawing
+    one by one for each LED.
+    '''
+    if pixel_style != 'circle' or pixel_size <= 2:
+        mask = np.ones((pixel_size, pixel_size), dtype=bool)
+    else:
+        image = Image.new('L', (pixel_size, pixel_size))
+        ImageDraw.Draw(image).ellipse((0, 0, pixel_size - 1, pixel_size - 1), fill=255, outline=255)
+        mask = np.asarray(image) > 0
+
+    mask.flags.writeable = False
+    return mask
+
+
+@lru_cache(maxsize=4)
+def __outside_mask(width, height, pixel_size, pixel_style):
+    # The pixel mask tiled over the whole image, inverted, as a PIL mask.
+    outside = ~np.tile(pixel_mask(pixel_size, pixel_style), (height, width))
+    return Image.fromarray(outside.astype(np.uint8) * 255)
+
+
+def upscale(frame, pixel_size, pixel_style='square'):
+    '''
+    Returns the (width * pixel_size, height * pixel_size) PIL image of a (height, width, 3) frame.
+
+    Each pixel of the frame becomes a block of pixel_size x pixel_size pixels. With the "circle" style,
+    the pixels of the block outside the LED mask are black.
+    '''
+    height, width = frame.shape[:2]
+    image = Image.fromarray(np.ascontiguousarray(frame))
+
+    if pixel_size > 1:
+        # nearest neighbour resampling is a block repeat
+        image = image.resize((width * pixel_size, height * pixel_size), Image.NEAREST)
+
+    if pixel_style == 'circle' and pixel_size > 2:
+        image.paste(0, mask=__outside_mask(width, height, pixel_size, pixel_style))
+
+    return image
@@ -0,0 +1,31 @@
+import json, os
+from functools import lru_cache
+
+CONFIG_PATH = 'emulator_config.json'
+
+
+@lru_cache(maxsize=1)
+def load_config():
+    '''
+    Returns the content of the emulator config file, parsed once per process, or None if there is no config file.
+
+    The dict is shared: it must not be modified.
+    '''
+    if not os.path.exists(CONFIG_PATH):
+        return None
+
+    with open(CONFIG_PATH) as config_file:
+        return json.load(config_file)
+
+
+def create_config(default_config):
+    '''
+    Writes the default config to the config file if there is no config file.
+    '''
+    if load_config() is not None:
+        return
+
+    with open(CONFIG_PATH, 'w') as config_file:
+        json.dump(default_config, config_file, indent=4)
+
+    load_config.cache_clear()
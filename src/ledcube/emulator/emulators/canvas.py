@@ -1,4 +1,4 @@
-from ledcube.emulator.graphics.color import Color
+import numpy as np
 
 
 class Canvas:
@@ -9,40 +9,81 @@ class Canvas:
         self.height = options.rows * options.parallel
         self.display_adapter = options.display_adapter.get_instance(self.width, self.height, options)
 
-        self.__pixels = [[Color.BLACK() for x in range(0, self.width)] for y in range(0, self.height)]
+        # The frame is a single contiguous height x width x RGB buffer. It is allocated once and
+        # all the drawing operations are done in place.
+        self.__pixels = np.zeros((self.height, self.width, 3), dtype=np.uint8)
 
         self.display_adapter.load_emulator_window()
 
+    @property
+    def frame(self):
+        '''
+        The frame buffer as a (height, width, 3) uint8 array, indexed [y, x].
+
+        This is not a copy: adapters must consider it as read-only.
+        '''
+        return self.__pixels
+
     def Clear(self):
-        self.__pixels = [[Color.BLACK() for x in range(0, self.width)] for y in range(0, self.height)]
+        self.__pixels.fill(0)
 
     def Fill(self, r, g, b):
-        self.__pixels = [[Color(r, g, b) for x in range(0, self.width)] for y in range(0, self.height)]
+        self.__pixels[:, :] = (self.__clamp(r), self.__clamp(g), self.__clamp(b))
 
     def SetPixel(self, x, y, r, g, b):
         if self.display_adapter.pixel_out_of_bounds(x, y):
             return
 
         try:
-            pixel = self.__pixels[int(y)][int(x)]
-            pixel.red = r
-            pixel.green = g
-            pixel.blue = b
+            self.__pixels[int(y), int(x)] = (self.__clamp(r), self.__clamp(g), self.__clamp(b))
         except Exception:
             pass
 
-    def SetImage(self, image, offset_x=0, offset_y=0, *other):
-        pixel_index = 0
-        pixels = [pixel for pixel in image.getdata()]
+    def SetPixels(self, xs, ys, rgb):
+        '''
+        Sets many pixels in one call.
+
+        xs and ys are sequences (or arrays) of coordinates. rgb is either a single (r, g, b) color or
+        an array with one (r, g, b) color per pixel. Out of bounds pixels are ignored.
+        '''
+        xs = np.asarray(xs)
+        ys = np.asarray(ys)
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        rgb = np.asarray(rgb)
+        if rgb.ndim > 1:
+            rgb = rgb[inside]
 
-        for y in range(0, image.height):
-            for x in range(0, image.width):
-                try:
-                    self.SetPixel(x + offset_x, y + offset_y, *pixels[pixel_index])
-                except Exception:
-                    pass
+        self.__pixels[ys[inside].astype(np.intp), xs[inside].astype(np.intp)] = self.__to_uint8(rgb)
 
-                pixel_index += 1
+    def SetArray(self, array, offset_x=0, offset_y=0):
+        '''
+        Copies a (height, width, 3) array of RGB values, indexed [y, x], to the canvas.
+
+        (offset_x, offset_y) is the position of the upper left corner of the array in the canvas.
+        The parts of the array outside the canvas are ignored.
+        A (height, width, 4) array of RGBA values is blended with the canvas.
+        '''
+        offset_x = int(offset_x)
+        offset_y = int(offset_y)
+        height, width = array.shape[:2]
+
+        x0 = max(offset_x, 0)
+        y0 = max(offset_y, 0)
+        x1 = min(offset_x + width, self.width)
+        y1 = min(offset_y + height, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        array = self.__to_uint8(array[y0 - offset_y:y1 - offset_y, x0 - offset_x:x1 - offset_x])
+        if array.shape[2] == 4:
+            alpha = array[..., 3:].astype(np.uint16)
+            target = self.__pixels[y0:y1, x0:x1]
+            array = ((array[..., :3] * alpha + target * (255 - alpha) + 127) // 255).astype(np.uint8)
+
+        self.__pixels[y0:y1, x0:x1] = array
+
+    def SetImage(self, image, offset_x=0, offset_y=0, *other):
+        self.SetArray(np.asarray(image.convert('RGB')), offset_x, offset_y)
 
     # These are delegated to the display adapter to handle specific implementation.
     def draw_to_screen(self):
@@ -52,4 +93,21 @@ class Canvas:
         self.display_adapter.draw_to_file(self.__pixels, filepath)
 
     def check_for_quit_event(self):
-        self.display_adapter.check_for_quit_event()
\ No newline at end of file
+        self.display_adapter.check_for_quit_event()
+
+    @staticmethod
+    def __to_uint8(values):
+        if isinstance(values, np.ndarray) and values.dtype == np.uint8:
+            return values
+        return np.clip(values, 0, 255).astype(np.uint8)
+
+    @staticmethod
+    def __clamp(value):
+        # The values are stored as uint8; the colors computed by the apps are often floats and can
+        # slightly overflow the 0..255 range.
+        value = int(value)
+        if value < 0:
+            return 0
+        if value > 255:
+            return 255
+        return value
@@ -38,6 +38,16 @@ class RGBMatrix:
         self.canvas.SetPixel(x, y, r, g, b)
         self.SwapOnVSync(self.canvas)
 
+    def SetPixels(self, xs, ys, rgb):
+        self.__sync_canvas()
+        self.canvas.SetPixels(xs, ys, rgb)
+        self.SwapOnVSync(self.canvas)
+
+    def SetArray(self, array, offset_x=0, offset_y=0):
+        self.__sync_canvas()
+        self.canvas.SetArray(array, offset_x, offset_y)
+        self.SwapOnVSync(self.canvas)
+
     def SetImage(self, image, offset_x=0, offset_y=0, *other):
         self.__sync_canvas()
         self.canvas.SetImage(image, offset_x, offset_y, *other)
@@ -1,6 +1,7 @@
-import json, os, pprint, sys
+import pprint, sys
 
-from ledcube.emulator.adapters import ADAPTER_TYPES
+from ledcube.emulator.adapters import ADAPTER_NAMES, load_adapter
+from ledcube.emulator.config import create_config, load_config
 from ledcube.emulator.logger import Logger
 
 
@@ -23,28 +24,28 @@ class RGBMatrixOptions:
 
         emulator_config = RGBMatrixEmulatorConfig()
 
-        if emulator_config.display_adapter.lower() in ADAPTER_TYPES:
-            self.display_adapter = ADAPTER_TYPES[emulator_config.display_adapter.lower()]
-        elif len(ADAPTER_TYPES.keys()) > 0:
-            adapter_types = ', '.join('"{}"'.format(key) for key in ADAPTER_TYPES.keys())
+        self.display_adapter = load_adapter(emulator_config.display_adapter.lower())
 
-            # Try to set it to the emulator default, but if it failed to load, pick the first one that did.
-            if emulator_config.DEFAULT_CONFIG.get('display_adapter') in ADAPTER_TYPES:
-                default_adapter = emulator_config.DEFAULT_CONFIG.get('display_adapter')
+        if self.display_adapter is None:
+            # Try to load the emulator default, and if it fails, the first one that loads.
+            default_adapter = emulator_config.DEFAULT_CONFIG.get('display_adapter')
+            for adapter_name in [default_adapter] + ADAPTER_NAMES:
+                self.display_adapter = load_adapter(adapter_name)
+                if self.display_adapter is not None:
+                    break
             else:
-                default_adapter = list(ADAPTER_TYPES.keys())[0]
+                Logger.critical("Failed to find a valid display adapter to load! Check that you have installed dependencies required for your configured adapter.")
 
-            Logger.warning('"{}" display adapter option not recognized. Valid adapters are {}. Defaulting to "{}"...'.format(
+                sys.exit(1)
+
+            adapter_types = ', '.join('"{}"'.format(key) for key in ADAPTER_NAMES)
+
+            Logger.warning('"{}" display adapter could not be loaded. Valid adapters are {}. Defaulting to "{}"...'.format(
                     emulator_config.display_adapter,
                     adapter_types,
-                    default_adapter
+                    adapter_name
                 )
             )
-            self.display_adapter = ADAPTER_TYPES[default_adapter]
-        else:
-            Logger.critical("Failed to find a valid display adapter to load! Check that you have installed dependencies required for your configured adapter.")
-
-            sys.exit(1)
 
         self.pixel_style = emulator_config.DEFAULT_CONFIG.get('pixel_style')
         config_pixel_style = emulator_config.pixel_style.lower()
@@ -62,6 +63,7 @@ class RGBMatrixOptions:
         self.pixel_outline = emulator_config.DEFAULT_CONFIG['pixel_outline']
         self.pixel_outline = emulator_config.pixel_outline
         self.browser = emulator_config.browser
+        self.recorder = emulator_config.recorder
 
         if emulator_config.suppress_font_warnings:
             import bdfparser
@@ -79,8 +81,6 @@ class RGBMatrixOptions:
 
 class RGBMatrixEmulatorConfig:
 
-    __CONFIG_PATH = 'emulator_config.json'
-
     VALID_PIXEL_STYLES = ['square', 'circle']
     DEFAULT_CONFIG = {
         'pixel_outline': 0,
@@ -95,9 +95,15 @@ class RGBMatrixEmulatorConfig:
             'target_fps': 24,
             'fps_display': False,
             'quality': 70,
+            'push': False,
+            'protocol': 'jpeg',
             'image_border': True,
             'debug_text': False
         },
+        'recorder': {
+            '_comment': 'For use with the recorder adapter only.',
+            'frames': 120
+        },
         "log_level": "info"
     }
 
@@ -108,14 +114,11 @@ class RGBMatrixEmulatorConfig:
         RGBMatrixEmulatorConfig.Utils.set_attributes(self)
 
     def __load_config(self):
-        if os.path.exists(self.__CONFIG_PATH):
-            with open(self.__CONFIG_PATH) as f:
-                config = json.load(f)
-
+        config = load_config()
+        if config is not None:
             return config
 
-        with open(self.__CONFIG_PATH, 'w') as f:
-            json.dump(self.DEFAULT_CONFIG, f, indent=4)
+        create_config(self.DEFAULT_CONFIG)
 
         return self.DEFAULT_CONFIG
 
@@ -1,3 +1,7 @@
+from functools import lru_cache
+
+import numpy as np
+
 from ledcube.emulator.graphics.color import Color
 from ledcube.emulator.graphics.font import Font
 
@@ -8,126 +12,165 @@ def DrawText(canvas, font, x, y, color, text):
     if len(text) == 0:
         return
 
-    # Support multiple spacings based on device width
-    character_widths = [__actual_width(font, letter) for letter in text]
-    first_char_width = character_widths[0]
-    max_char_width = max(character_widths)
-    total_width = sum(character_widths)
-
-    # Offscreen to the left, adjust by first character width
-    if x < 0:
-        adjustment = abs(x + first_char_width) // first_char_width
-        text = text[adjustment:]
-        if adjustment:
-            x += first_char_width * adjustment
-
-    # Offscreen to the right, rough adjustment by max width
-    if (total_width + x) > canvas.width:
-        text = text[: ((canvas.width + 1) // max_char_width) + 2]
-
-    # Draw the text!
-    if len(text) != 0:
-        # Ensure text doesn't get drawn as multiple lines
-        linelimit = len(text) * (font.headers['fbbx'] + 1)
-
-        text_map = font.bdf_font.draw(text, linelimit, missing=font.default_character).todata(2)
-        font_y_offset = -(font.headers['fbby'] + font.headers['fbbyoff'])
-
-        for y2, row in enumerate(text_map):
-            for x2, value in enumerate(row):
-                if value == 1:
-                    try:
-                        if isinstance(color, tuple):
-                            canvas.SetPixel(x + x2, y + y2 + font_y_offset, *color)
-                        else:
-                            canvas.SetPixel(x + x2, y + y2 + font_y_offset, color.red, color.green, color.blue)
-                    except Exception:
-                        pass
+    xs, ys, total_width = __render_text(font, font.generation, text)
+
+    # The text is drawn entirely; the parts outside the canvas are ignored by SetPixels.
+    font_y_offset = -(font.headers['fbby'] + font.headers['fbbyoff'])
+    rgb = color if isinstance(color, tuple) else (color.red, color.green, color.blue)
+    canvas.SetPixels(xs + x, ys + (y + font_y_offset), rgb)
 
     return total_width
 
 def DrawLine(canvas, x1, y1, x2, y2, color):
     int_points = __coerce_int(x1, y1, x2, y2)
-    rows, cols = __line(*int_points)
+    xs, ys = __line(*int_points)
 
-    for point in zip(rows, cols):
-        canvas.SetPixel(*point, color.red, color.green, color.blue)
+    canvas.SetPixels(xs, ys, __rgb(color))
+
+def DrawLines(canvas, lines, color):
+    '''
+    Draws many lines in one call.
+
+    lines is a sequence of (x1, y1, x2, y2). color is a color for all the lines or a sequence with one color per line.
+    '''
+    lines = np.trunc(np.asarray(lines, dtype=float)).astype(int).reshape(-1, 4)
+    if len(lines) == 0:
+        return
+
+    xs, ys, counts = __lines(*lines.T)
+
+    canvas.SetPixels(xs, ys, __rgb(color, counts))
 
 def DrawCircle(canvas, x, y, r, color):
     int_points = __coerce_int(x, y)
-    rows, cols = __circle_perimeter(*int_points, r)
+    xs, ys = __circle_perimeter(r)
 
-    for point in zip(rows, cols):
-        canvas.SetPixel(*point, color.red, color.green, color.blue)
+    canvas.SetPixels(xs + int_points[0], ys + int_points[1], __rgb(color))
 
-def __actual_width(font, letter):
+def DrawCircles(canvas, circles, color):
     '''
-    Returns the actual width of the letter in the font. If the font doesn't contain a glyph for this letter, it falls back to
-    the width of the default character (?) to prevent division by 0.
+    Draws many circles in one call.
+
+    circles is a sequence of (x, y, r). color is a color for all the circles or a sequence with one color per circle.
     '''
-    width = font.CharacterWidth(ord(letter))
-    
-    if width > 0:
-        return width
+    perimeters = [(int(x), int(y), __circle_perimeter(r)) for x, y, r in circles]
+    if not perimeters:
+        return
+
+    xs = np.concatenate([xs + x for x, _y, (xs, _ys) in perimeters])
+    ys = np.concatenate([ys + y for _x, y, (_xs, ys) in perimeters])
+    counts = [len(xs) for _x, _y, (xs, _ys) in perimeters]
 
-    return font.CharacterWidth(font.default_character.cp())
+    canvas.SetPixels(xs, ys, __rgb(color, counts))
+
+def FillRect(canvas, x, y, width, height, color):
+    '''
+    Fills the rectangle of the given size whose upper left corner is (x, y).
+    '''
+    width = int(width)
+    height = int(height)
+    if width <= 0 or height <= 0:
+        return
+
+    canvas.SetArray(np.broadcast_to(np.asarray(__rgb(color)), (height, width, 3)), int(x), int(y))
+
+def FillCircle(canvas, x, y, r, color):
+    '''
+    Fills the disk of center (x, y) and radius r: the pixels at a distance of r or less from the center.
+    '''
+    int_points = __coerce_int(x, y)
+    xs, ys = __disk(int(r))
+
+    canvas.SetPixels(xs + int_points[0], ys + int_points[1], __rgb(color))
+
+@lru_cache(maxsize=256)
+def __render_text(font, _generation, text):
+    '''
+    Returns the (xs, ys) coordinates of the pixels of the text, relative to its upper left corner, and the width of the text.
+
+    The texts are cached by font and generation of the font, which changes when another font is loaded in it.
+
+    The text is composited from the glyph bitmaps of the font, the same way bdfparser draws a line of text:
+    each glyph is drawn at the sum of the advances of the previous glyphs.
+    '''
+    glyphs = [font.glyph(ord(letter)) for letter in text]
+    advances = [advance for _bitmap, advance, _width in glyphs]
+    positions = np.concatenate(([0], np.cumsum(advances[:-1]))).astype(int)
+    positions -= min(positions.min(), 0)
+
+    height = max(bitmap.shape[0] for bitmap, _advance, _width in glyphs)
+    width = max(position + bitmap.shape[1] for position, (bitmap, _advance, _width) in zip(positions, glyphs))
+    text_map = np.zeros((height, width), dtype=bool)
+    for position, (bitmap, _advance, _width) in zip(positions, glyphs):
+        # the glyphs are aligned at the bottom
+        text_map[height - bitmap.shape[0]:, position:position + bitmap.shape[1]] |= bitmap
+
+    ys, xs = np.nonzero(text_map)
+    xs.flags.writeable = False
+    ys.flags.writeable = False
+
+    return xs, ys, sum(width for _bitmap, _advance, width in glyphs)
 
 def __coerce_int(*values):
     return [int(value) for value in values]
 
+def __rgb(color, counts=None):
+    '''
+    Returns the (r, g, b) of a color, or with counts, the array of the colors of a sequence of colors
+    repeated counts times each.
+    '''
+    if hasattr(color, 'red'):
+        return (color.red, color.green, color.blue)
+    # a color is a sequence of scalars; a sequence of colors, even of three colors, is not
+    if np.ndim(color[0]) == 0 and not hasattr(color[0], 'red'):
+        return tuple(color)
+
+    colors = np.array([(c.red, c.green, c.blue) if hasattr(c, 'red') else c for c in color])
+    return np.repeat(colors, counts, axis=0)
+
 def __line(x1, y1, x2, y2):
     '''
     Line drawing algorithm
 
-    Extracted from scikit-image:
+    Returns the same points as the scikit-image algorithm:
     https://github.com/scikit-image/scikit-image/blob/00177e14097237ef20ed3141ed454bc81b308f82/skimage/draw/_draw.pyx#L44
     '''
-    steep = 0
-    r = x1
-    c = y1
-    dr = abs(x2 - x1)
-    dc = abs(y2 - y1)
-
-    rr = [0] * (max(dc, dr) + 1)
-    cc = [0] * (max(dc, dr) + 1)
-
-    if (y2 - c) > 0:
-        sc = 1
-    else:
-        sc = -1
-    if (x2 - r) > 0:
-        sr = 1
-    else:
-        sr = -1
-    if dr > dc:
-        steep = 1
-        c, r = r, c
-        dc, dr = dr, dc
-        sc, sr = sr, sc
-    d = (2 * dr) - dc
-
-    for i in range(dc):
-        if steep:
-            rr[i] = c
-            cc[i] = r
-        else:
-            rr[i] = r
-            cc[i] = c
-        while d >= 0:
-            r = r + sr
-            d = d - (2 * dc)
-        c = c + sc
-        d = d + (2 * dr)
+    xs, ys, _counts = __lines(np.array([x1]), np.array([y1]), np.array([x2]), np.array([y2]))
+    return xs, ys
+
+def __lines(x1, y1, x2, y2):
+    '''
+    Vectorized line drawing, for arrays of lines. Returns the xs and ys of the points and the number of points of each line.
+
+    The points of each line are the points of the Bresenham algorithm of __line(): along the major axis, one point
+    per step; on the minor axis, the offset of the step i is round(i * minor / major), rounding halves up.
+    '''
+    dx = np.abs(x2 - x1)
+    dy = np.abs(y2 - y1)
+    x_major = dx > dy
+    major = np.maximum(dx, dy)
+    minor = np.minimum(dx, dy)
 
-    rr[dc] = x2
-    cc[dc] = y2
+    counts = major + 1
+    line = np.repeat(np.arange(len(counts)), counts)
+    i = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
 
-    return (rr, cc)
+    major = major[line]
+    k = (2 * minor[line] * i + major) // np.maximum(2 * major, 1)
+    x_major = x_major[line]
 
-def __circle_perimeter(x, y, radius):
+    xs = x1[line] + np.sign(x2 - x1)[line] * np.where(x_major, i, k)
+    ys = y1[line] + np.sign(y2 - y1)[line] * np.where(x_major, k, i)
+
+    return xs, ys, counts
+
+@lru_cache(maxsize=64)
+def __circle_perimeter(radius):
     '''
     Bresenham circle algorithm
-    
+
+    Returns the (xs, ys) offsets of the points of the circle from its center. They are computed once per radius.
+
     Extracted from scikit-image
     https://github.com/scikit-image/scikit-image/blob/00177e14097237ef20ed3141ed454bc81b308f82/skimage/draw/_draw.pyx#L248
     '''
@@ -139,8 +182,8 @@ def __circle_perimeter(x, y, radius):
     d = 3 - 2 * radius
 
     while r >= c:
-        rr.extend([_ + x for _ in [r, -r, r, -r, c, -c, c, -c]])
-        cc.extend([_ + y for _ in [c, c, -c, -c, r, r, -r, -r]])
+        rr.extend([r, -r, r, -r, c, -c, c, -c])
+        cc.extend([c, c, -c, -c, r, r, -r, -r])
 
         if d < 0:
             d += 4 * c + 6
@@ -149,4 +192,57 @@ def __circle_perimeter(x, y, radius):
             r -= 1
         c += 1
 
-    return (rr, cc)
+    xs = np.array(rr)
+    ys = np.array(cc)
+    xs.flags.writeable = False
+    ys.flags.writeable = False
+
+    return xs, ys
+
+@lru_cache(maxsize=64)
+def __disk(radius):
+    '''
+    Returns the (xs, ys) offsets of the points of the disk of the given radius from its center, computed once per radius.
+
+    The disk is made of the vertical lines of the fillCircle of Adafruit GFX, like ledcube.core.sprite.disk_lines():
+    https://github.com/adafruit/Adafruit-GFX-Library/blob/master/Adafruit_GFX.cpp#L471
+    '''
+    # half height of the vertical line of each column, -1 for the columns without line
+    half_heights = np.full(2 * max(radius, 0) + 1, -1)
+    if radius == 1:
+        half_heights[1] = 0
+    elif radius > 1:
+        half_heights[radius] = radius
+        f = 1 - radius
+        dd_f_x = 1
+        dd_f_y = -2 * radius
+        x = 0
+        y = radius
+        px = x
+        py = y
+        while x < y:
+            if f >= 0:
+                y -= 1
+                dd_f_y += 2
+                f += dd_f_y
+
+            x += 1
+            dd_f_x += 2
+            f += dd_f_x
+
+            if x <= (y + 1):
+                half_heights[radius + x] = half_heights[radius - x] = max(half_heights[radius + x], y)
+
+            if y != py:
+                half_heights[radius + py] = half_heights[radius - py] = max(half_heights[radius + py], px)
+                py = y
+
+            px = x
+
+    counts = np.maximum(2 * half_heights + 1, 0)
+    xs = np.repeat(np.arange(len(counts)) - max(radius, 0), counts)
+    ys = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) - np.repeat(half_heights, counts)
+    xs.flags.writeable = False
+    ys.flags.writeable = False
+
+    return xs, ys
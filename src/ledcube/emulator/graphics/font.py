@@ -1,34 +1,108 @@
 import bdfparser
+import numpy as np
+
+from ledcube.emulator.graphics import font_cache
+
+# All rpi-rgb-led-matrix fonts have a character at 0xFFFD to represent a missing character
+DEFAULT_CHARACTER = 0xFFFD
 
 
 class Font:
     def __init__(self):
-        self.bdf_font = None
         self.headers = {}
         self.spacing = {}
+        self.generation = 0     # incremented by LoadFont(), to invalidate the texts rendered with the previous font
+        self.__path = None
+        self.__bdf_font = None
+        self.__atlas = None
+        self.__glyphs = {}
 
     def LoadFont(self, path):
-        self.bdf_font = bdfparser.Font(path)
-        self.headers = self.bdf_font.headers
-        self.props = self.bdf_font.props
+        # The glyphs come from the glyph atlas of the font; the BDF file is parsed only if there is no atlas yet.
+        self.__path = path
+        self.__bdf_font = None
+        self.__atlas = font_cache.load_atlas(path, lambda: self.bdf_font)
+        self.headers = self.__atlas.headers
+        self.props = self.__atlas.props
+        self.__glyphs = {}
+        self.generation += 1
 
-        # All rpi-rgb-led-matrix fonts have a character at 0xFFFD to represent a missing character
-        # Cache this for use later so we don't have to constantly look it up
-        self.default_character = self.bdf_font.glyphbycp(0xFFFD)
+    @property
+    def bdf_font(self):
+        '''
+        The bdfparser font, parsed on first access.
+        '''
+        if self.__bdf_font is None and self.__path is not None:
+            self.__bdf_font = bdfparser.Font(self.__path)
+
+        return self.__bdf_font
+
+    @property
+    def default_character(self):
+        if self.bdf_font is None:
+            return None
+
+        return self.bdf_font.glyphbycp(DEFAULT_CHARACTER)
 
     def CharacterWidth(self, char):
         # Missing glyphs return 0 width in rpi-rgb-led-matrix
-        if self.bdf_font == None or not self.bdf_font.glyphbycp(char):
+        if self.__atlas is None:
+            return 0
+
+        i = self.__atlas.index(char)
+        if i < 0:
             return 0
 
-        return self.bdf_font.glyphbycp(char).meta['dwx0']
+        return int(self.__atlas.widths[i])
+
+    def glyph(self, char):
+        '''
+        Returns the (bitmap, advance, width) of the glyph of a codepoint.
+
+        bitmap is a (height, width) boolean array, the glyph drawn in the font bounding box, as bdfparser draws it.
+        advance is the horizontal distance to the next glyph. width is the width used by DrawText: the width of
+        the default character (?) if the font has no glyph for the codepoint.
+        '''
+        glyph = self.__glyphs.get(char)
+        if glyph is None:
+            glyph = self.__glyphs[char] = self.__unpack(char)
+
+        return glyph
+
+    def __unpack(self, char):
+        atlas = self.__atlas
+        i = atlas.index(char)
+        if i < 0:
+            i = atlas.index(DEFAULT_CHARACTER)
+
+        if i < 0:
+            bitmap = np.zeros((self.headers['fbby'], self.headers['fbbx']), dtype=bool)
+            advance = None
+        else:
+            bitmap = atlas.bitmap(i)
+            advance = int(atlas.advances[i])
+            if advance < 0:
+                advance = None
+
+        # same fallbacks as bdfparser's Font.draw()
+        if advance is None:
+            advance = self.headers.get('dwx0', self.headers.get('dwy0'))
+        if advance is None:
+            advance = bitmap.shape[1]
+
+        width = self.CharacterWidth(char)
+        if width <= 0:
+            width = self.CharacterWidth(DEFAULT_CHARACTER)
+
+        bitmap.flags.writeable = False
+        return bitmap, advance, width
 
     @property
     def height(self):
-        if self.bdf_font is None: return -1
+        if self.__atlas is None: return -1
         return self.headers['fbby']
 
     @property
     def baseline(self):
-        if self.bdf_font is None: return 0
+        if self.__atlas is None: return 0
         return self.headers['fbby'] + self.headers['fbbyoff']
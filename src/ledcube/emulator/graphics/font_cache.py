@@ -0,0 +1,172 @@
+'''
+Binary cache of the BDF fonts.
+
+The glyphs of a font are rasterized once and saved as a glyph atlas in the user cache directory, keyed by
+the hash of the BDF file. The next loads memory-map the atlas instead of parsing the BDF file.
+
+    offset  size
+    0       4       magic: b'LCFA'
+    4       2       version
+    6       2       reserved
+    8       4       n: number of glyphs
+    12      4       size of the metadata
+    16      ...     metadata, JSON: the headers and the properties of the font
+    ...             padding to a multiple of 8 bytes
+                    codepoints  int32 x n, sorted
+                    advances    int32 x n, -1 if the glyph has no DWIDTH
+                    widths      int32 x n, the DWIDTH of the glyph, 0 if it has none
+                    bitmaps     uint8 x n x fbby x ceil(fbbx / 8), the glyphs drawn in the font bounding box,
+                                packed by rows (numpy.packbits)
+
+All the values are little-endian.
+'''
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from ledcube.emulator.logger import Logger
+
+MAGIC = b'LCFA'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHHII')
+
+
+def cache_dir():
+    '''
+    Returns the directory of the glyph atlases: $LEDCUBE_CACHE_DIR, or ledcube/fonts in the user cache directory.
+    '''
+    if os.environ.get('LEDCUBE_CACHE_DIR'):
+        return os.environ['LEDCUBE_CACHE_DIR']
+
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ledcube', 'fonts')
+
+
+def cache_path(bdf_path):
+    with open(bdf_path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:16]
+
+    name = os.path.splitext(os.path.basename(bdf_path))[0]
+    return os.path.join(cache_dir(), f'{name}-{digest}.lcfa')
+
+
+class GlyphAtlas:
+    '''
+    The rasterized glyphs of a font.
+    '''
+
+    def __init__(self, headers, props, codepoints, advances, widths, bitmaps):
+        self.headers = headers
+        self.props = props
+        self.codepoints = codepoints
+        self.advances = advances
+        self.widths = widths
+        self.__bitmaps = bitmaps
+
+    def index(self, char):
+        '''
+        Returns the index of the glyph of a codepoint, or -1 if the font has no glyph for it.
+        '''
+        i = int(np.searchsorted(self.codepoints, char))
+        if i < len(self.codepoints) and self.codepoints[i] == char:
+            return i
+        return -1
+
+    def bitmap(self, i):
+        '''
+        Returns the (fbby, fbbx) boolean bitmap of the glyph i.
+        '''
+        return np.unpackbits(self.__bitmaps[i], axis=1, count=self.headers['fbbx']).astype(bool)
+
+    @classmethod
+    def from_bdf(cls, bdf_font):
+        headers = bdf_font.headers
+        codepoints = sorted(bdf_font.glyphs)
+        advances = []
+        widths = []
+        bitmaps = []
+        for char in codepoints:
+            glyph = bdf_font.glyphbycp(char)
+            advance = glyph.meta['dwx0'] or glyph.meta['dwy0']
+            advances.append(-1 if advance is None else advance)
+            widths.append(glyph.meta['dwx0'] or 0)
+            bitmap = np.array(glyph.draw().todata(2), dtype=np.uint8).reshape(headers['fbby'], headers['fbbx'])
+            bitmaps.append(np.packbits(bitmap, axis=1))
+
+        row_bytes = (headers['fbbx'] + 7) // 8
+        return cls(dict(headers), dict(bdf_font.props),
+                   np.array(codepoints, dtype='<i4'),
+                   np.array(advances, dtype='<i4'),
+                   np.array(widths, dtype='<i4'),
+                   np.array(bitmaps, dtype=np.uint8).reshape(-1, headers['fbby'], row_bytes))
+
+    def save(self, path):
+        metadata = json.dumps({'headers': self.headers, 'props': self.props}, default=str).encode()
+        padding = b'\0' * (-(HEADER.size + len(metadata)) % 8)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # written to a temporary file then renamed, so that another process never reads a partial atlas
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, 0, len(self.codepoints), len(metadata)))
+                f.write(metadata)
+                f.write(padding)
+                for array in (self.codepoints, self.advances, self.widths, self.__bitmaps):
+                    f.write(np.ascontiguousarray(array).tobytes())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _reserved, count, metadata_size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a glyph atlas of version {VERSION}")
+
+        offset = HEADER.size
+        metadata = json.loads(bytes(data[offset:offset + metadata_size]))
+        offset += metadata_size
+        offset += -offset % 8
+
+        headers = metadata['headers']
+        arrays = []
+        for dtype, shape in (('<i4', (count,)), ('<i4', (count,)), ('<i4', (count,)),
+                             (np.uint8, (count, headers['fbby'], (headers['fbbx'] + 7) // 8))):
+            array = np.frombuffer(data, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+            offset += array.nbytes
+            arrays.append(array)
+
+        return cls(headers, metadata['props'], *arrays)
+
+
+def load_atlas(bdf_path, parse):
+    '''
+    Returns the glyph atlas of a BDF font, from the cache if possible.
+
+    parse is called to get the bdfparser font when the atlas has to be built. If the atlas can not be saved,
+    the font is still loaded, it will just be parsed again the next time.
+    '''
+    path = cache_path(bdf_path)
+    try:
+        return GlyphAtlas.load(path)
+    except (OSError, ValueError, struct.error):
+        pass
+
+    atlas = GlyphAtlas.from_bdf(parse())
+    try:
+        atlas.save(path)
+    except OSError as e:
+        Logger.debug(f"Could not save the glyph atlas of {bdf_path}: {e}")
+
+    return atlas
@@ -1,10 +1,11 @@
-import json, logging
+import logging
+
+from ledcube.emulator.config import load_config
 
 # Try to load the config from file. (Default: INFO)
 try:
-    with open("emulator_config.json") as config_file:
-        log_level_name = json.load(config_file).get("log_level", 'INFO').upper()
-        log_level = getattr(logging, log_level_name)
+    log_level_name = (load_config() or {}).get("log_level", 'INFO').upper()
+    log_level = getattr(logging, log_level_name)
 except:
     log_level = logging.INFO
 
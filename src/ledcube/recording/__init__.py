@@ -0,0 +1,2 @@
+from .player import Player, RecordingReader
+from .writer import RecordingWriter
@@ -0,0 +1,197 @@
+"""The recording file format.
+
+A recording is:
+
+    header      HEADER, followed by the palette, if any: palette_size x (r, g, b) bytes
+    frames      FRAME, followed by the payload of the frame, for each frame
+    index       frame_count x INDEX_ENTRY, written when the recording is closed
+
+All the values are little-endian.
+
+The frames are stored face-major: (faces, panel_size, panel_size) pixels, the faces in the order of the
+Face enum, the rows of each face from top to bottom as on the canvas.
+
+Payloads, zlib compressed if the header has the COMPRESSED flag:
+
+    KEY             the pixels, RGB
+    KEY_PALETTE     the pixels, as indexes in the palette
+    DELTA           the runs of pixels that changed since the previous frame: the number of runs (uint32),
+                    the starts of the runs (uint32 x runs), the lengths of the runs (uint32 x runs),
+                    then the pixels of the runs, RGB
+    DELTA_PALETTE   same as DELTA, the pixels of the runs as indexes in the palette
+
+A frame is stored with a palette encoding only when all its colors are in the palette.
+"""
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from ledcube.core.enums import Face, face_offsets, PANEL
+
+MAGIC = b'LCUB'
+VERSION = 1
+
+# magic, version, faces, panel_size, flags, keyframe_interval, frame_count, index_offset, palette_size
+HEADER = struct.Struct('<4sHBHBHIQH')
+
+# encoding, timestamp (seconds since the start of the recording), payload size
+FRAME = struct.Struct('<BdI')
+
+INDEX_ENTRY = np.dtype([('offset', '<u8'), ('timestamp', '<f8'), ('encoding', 'u1')])
+
+# header flags
+PALETTE = 1
+COMPRESSED = 2
+
+# frame encodings
+KEY = 0
+KEY_PALETTE = 1
+DELTA = 2
+DELTA_PALETTE = 3
+
+KEY_FRAMES = (KEY, KEY_PALETTE)
+
+MERGE_GAP = 2   # runs separated by up to MERGE_GAP unchanged pixels are stored as one run
+
+Header = namedtuple('Header', ['version', 'faces', 'panel_size', 'flags', 'keyframe_interval',
+                               'frame_count', 'index_offset', 'palette_size'])
+
+
+def pack_header(header):
+    return HEADER.pack(MAGIC, *header)
+
+
+def unpack_header(data):
+    magic, *values = HEADER.unpack(data[:HEADER.size])
+    if magic != MAGIC:
+        raise ValueError("Not a LED cube recording")
+
+    header = Header(*values)
+    if header.version > VERSION:
+        raise ValueError(f"Unsupported recording version {header.version}")
+
+    return header
+
+
+def face_slices(panel_size=PANEL):
+    """Return, for each face, the (rows, columns) slices of the face in the canvas."""
+    scale = panel_size / PANEL
+    slices = []
+    for face in Face:
+        x = int(face_offsets[face].x * scale)
+        y = int(face_offsets[face].y * scale)
+        slices.append((slice(y, y + panel_size), slice(x, x + panel_size)))
+    return slices
+
+
+def canvas_to_faces(frame, panel_size=PANEL):
+    """Return a face-major copy, (faces, panel_size, panel_size, 3), of a canvas frame."""
+    return np.stack([frame[rows, columns] for rows, columns in face_slices(panel_size)])
+
+
+def faces_to_canvas(faces, canvas):
+    """Copy the faces of a face-major frame to their place in a (height, width, 3) canvas array."""
+    for face, (rows, columns) in zip(faces, face_slices(faces.shape[1])):
+        canvas[rows, columns] = face
+
+
+def pack_colors(colors):
+    colors = np.asarray(colors, dtype=np.uint32)
+    return (colors[..., 0] << 16) | (colors[..., 1] << 8) | colors[..., 2]
+
+
+def changed_runs(changed):
+    """Return the starts and the lengths of the runs of True values of a 1D boolean array.
+
+    Runs separated by MERGE_GAP values or less are merged: storing a few unchanged pixels
+    costs less than storing a new run.
+    """
+    edges = np.diff(np.concatenate(([0], changed.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    if len(starts) > 1:
+        split = np.flatnonzero(starts[1:] - ends[:-1] > MERGE_GAP) + 1
+        starts = starts[np.concatenate(([0], split))]
+        ends = ends[np.concatenate((split - 1, [len(ends) - 1]))]
+
+    return starts, ends - starts
+
+
+def runs_indexes(starts, lengths):
+    """Return the indexes of all the values of the runs."""
+    ends = np.cumsum(lengths)
+    return np.arange(ends[-1] if len(ends) else 0) - np.repeat(ends - lengths - starts, lengths)
+
+
+class Encoder:
+    """Encode the successive face-major frames of a recording."""
+
+    def __init__(self, palette=None, keyframe_interval=60):
+        # stored as an uint16 in the header
+        if not 1 <= keyframe_interval <= 0xFFFF:
+            raise ValueError(f"The key frame interval must be between 1 and 65535, not {keyframe_interval}")
+        self.keyframe_interval = keyframe_interval
+        self.__previous = None
+        self.__count = 0
+
+        self.palette = None
+        if palette is not None:
+            self.palette = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+            if len(self.palette) > 256:
+                raise ValueError("The palette can not have more than 256 colors")
+            packed = pack_colors(self.palette)
+            self.__order = np.argsort(packed)
+            self.__sorted = packed[self.__order]
+
+    def __indexes(self, pixels):
+        # The indexes of the pixels in the palette, or None if a color is not in the palette.
+        packed = pack_colors(pixels)
+        positions = np.minimum(np.searchsorted(self.__sorted, packed), len(self.__sorted) - 1)
+        if not np.array_equal(self.__sorted[positions], packed):
+            return None
+        return self.__order[positions].astype(np.uint8)
+
+    def encode(self, faces):
+        """Return the (encoding, payload) of a frame. The payload is not compressed."""
+        pixels = faces.reshape(-1, 3)
+        previous = self.__previous
+        keyframe = previous is None or self.__count % self.keyframe_interval == 0
+        self.__previous = pixels
+        self.__count += 1
+
+        indexes = self.__indexes(pixels) if self.palette is not None else None
+        values = pixels if indexes is None else indexes
+
+        if not keyframe:
+            starts, lengths = changed_runs(np.any(pixels != previous, axis=1))
+            delta_size = 4 + len(starts) * 8 + int(lengths.sum()) * values[0].nbytes
+            if delta_size < values.nbytes:
+                payload = b''.join((struct.pack('<I', len(starts)),
+                                    starts.astype('<u4').tobytes(),
+                                    lengths.astype('<u4').tobytes(),
+                                    values[runs_indexes(starts, lengths)].tobytes()))
+                return (DELTA if indexes is None else DELTA_PALETTE), payload
+
+        return (KEY if indexes is None else KEY_PALETTE), values.tobytes()
+
+
+def decode(encoding, payload, pixels, palette=None):
+    """Decode a frame payload (not compressed) into pixels, the (n, 3) pixels of the previous frame, in place."""
+    if encoding == KEY:
+        pixels[:] = np.frombuffer(payload, dtype=np.uint8).reshape(-1, 3)
+    elif encoding == KEY_PALETTE:
+        pixels[:] = palette[np.frombuffer(payload, dtype=np.uint8)]
+    elif encoding in (DELTA, DELTA_PALETTE):
+        runs = struct.unpack_from('<I', payload)[0]
+        starts = np.frombuffer(payload, dtype='<u4', count=runs, offset=4)
+        lengths = np.frombuffer(payload, dtype='<u4', count=runs, offset=4 + runs * 4)
+        values = np.frombuffer(payload, dtype=np.uint8, offset=4 + runs * 8)
+        indexes = runs_indexes(starts.astype(np.intp), lengths.astype(np.intp))
+        if encoding == DELTA:
+            pixels[indexes] = values.reshape(-1, 3)
+        else:
+            pixels[indexes] = palette[values]
+    else:
+        raise ValueError(f"Unknown frame encoding {encoding}")
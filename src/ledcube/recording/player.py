@@ -0,0 +1,166 @@
+import mmap
+import time
+import zlib
+
+import numpy as np
+
+from ledcube.recording import file_format
+
+
+class RecordingReader:
+    """Read the frames of a recording file.
+
+    The file is memory-mapped: only the frames read are loaded. Reading the frames in order decodes each
+    frame once; reading any other frame decodes it from the previous key frame.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.__file = open(path, 'rb')
+        self.__data = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.header = file_format.unpack_header(self.__data)
+        offset = file_format.HEADER.size
+
+        self.palette = None
+        if self.header.flags & file_format.PALETTE:
+            # copied, so that the mmap can be closed
+            self.palette = np.frombuffer(self.__data, dtype=np.uint8, count=self.header.palette_size * 3,
+                                         offset=offset).reshape(-1, 3).copy()
+            offset += self.header.palette_size * 3
+
+        if self.header.index_offset:
+            self.index = np.frombuffer(self.__data, dtype=file_format.INDEX_ENTRY, count=self.header.frame_count,
+                                       offset=self.header.index_offset)
+        else:
+            # the recording has not been closed: the index is rebuilt from the frames
+            self.index = self.__scan(offset)
+
+        self.timestamps = self.index['timestamp']
+        self.keyframes = np.flatnonzero(np.isin(self.index['encoding'], file_format.KEY_FRAMES))
+
+        panel_size = self.header.panel_size
+        self.shape = (self.header.faces, panel_size, panel_size, 3)
+        self.__pixels = np.zeros((self.header.faces * panel_size * panel_size, 3), dtype=np.uint8)
+        self.__position = -1    # frame currently in __pixels
+
+    def __len__(self):
+        return len(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    @property
+    def duration(self):
+        return float(self.timestamps[-1]) if len(self) else 0.0
+
+    def close(self):
+        self.__pixels = None
+        self.index = None
+        self.timestamps = None
+        self.__data.close()
+        self.__file.close()
+
+    def __scan(self, offset):
+        entries = []
+        while offset + file_format.FRAME.size <= len(self.__data):
+            encoding, timestamp, size = file_format.FRAME.unpack_from(self.__data, offset)
+            if offset + file_format.FRAME.size + size > len(self.__data):
+                break   # truncated frame
+            entries.append((offset, timestamp, encoding))
+            offset += file_format.FRAME.size + size
+        return np.array(entries, dtype=file_format.INDEX_ENTRY)
+
+    def __decode(self, frame):
+        offset = int(self.index['offset'][frame])
+        encoding, _timestamp, size = file_format.FRAME.unpack_from(self.__data, offset)
+        payload = self.__data[offset + file_format.FRAME.size:offset + file_format.FRAME.size + size]
+        if self.header.flags & file_format.COMPRESSED:
+            payload = zlib.decompress(payload)
+        file_format.decode(encoding, payload, self.__pixels, self.palette)
+
+    def frame(self, frame):
+        """Return the faces of a frame, a (faces, panel_size, panel_size, 3) array.
+
+        The array is reused by the next call: copy it to keep it.
+        """
+        if not 0 <= frame < len(self):
+            raise IndexError(f"Frame {frame} out of range")
+
+        if frame != self.__position:
+            # start from the last key frame before the frame, unless the current frame is after it
+            keyframe = int(self.keyframes[np.searchsorted(self.keyframes, frame, side='right') - 1])
+            if frame < self.__position or keyframe > self.__position:
+                self.__position = keyframe - 1
+
+            for position in range(self.__position + 1, frame + 1):
+                self.__decode(position)
+            self.__position = frame
+
+        return self.__pixels.reshape(self.shape)
+
+    def frame_at(self, seconds):
+        """Return the number of the frame displayed at the given time."""
+        return max(int(np.searchsorted(self.timestamps, seconds, side='right')) - 1, 0)
+
+
+class Player:
+    """Play a recording on the cube, each frame at its recorded time.
+
+    The frames are scheduled from the start of the playback, not from the previous frame: the time spent
+    decoding and displaying the frames does not accumulate. The frames that are late are still displayed,
+    as soon as possible.
+    """
+
+    def __init__(self, cube, path, speed=1.0):
+        self.cube = cube
+        self.reader = RecordingReader(path)
+        self.speed = speed
+        self.position = 0       # next frame to display
+        self.late = 0           # number of frames displayed later than their time
+
+        self.__slices = file_format.face_slices(self.reader.header.panel_size)
+
+    def seek(self, frame):
+        self.position = min(max(int(frame), 0), len(self.reader) - 1)
+
+    def seek_time(self, seconds):
+        self.position = self.reader.frame_at(seconds)
+
+    def show(self, frame):
+        """Display a frame on the cube."""
+        for face, (rows, columns) in zip(self.reader.frame(frame), self.__slices):
+            self.cube.blit(face, columns.start, rows.start)
+        self.cube.refresh()
+
+    def play(self, loop=False):
+        """Play the recording from the current position. Returns at the end of the recording, unless loop is True.
+
+        At the end of the recording, the next call plays it from the start.
+        """
+        reader = self.reader
+        if len(reader) == 0:
+            return
+        if self.position >= len(reader):
+            self.position = 0
+
+        while True:
+            start = time.monotonic() - reader.timestamps[self.position] / self.speed
+            while self.position < len(reader):
+                delay = start + reader.timestamps[self.position] / self.speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -0.001:
+                    self.late += 1
+                self.show(self.position)
+                self.position += 1
+
+            if not loop:
+                return
+            self.position = 0
+
+    def close(self):
+        self.reader.close()
@@ -0,0 +1,113 @@
+import queue
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from ledcube.core.enums import Face, PANEL
+from ledcube.recording import file_format
+
+
+class RecordingWriter:
+    """Write the frames of the canvas to a recording file.
+
+    write() only copies the faces of the frame; the frames are encoded, compressed and written to the file
+    by a background thread. close() must be called at the end to write the index of the frames.
+    """
+
+    COMPRESSION_LEVEL = 1
+
+    def __init__(self, path, panel_size=PANEL, palette=None, keyframe_interval=60, compress=True, queue_size=256):
+        self.path = path
+        self.panel_size = panel_size
+        self.compress = compress
+        self.frames = 0     # number of frames written
+
+        self.__encoder = file_format.Encoder(palette, keyframe_interval)
+        self.__flags = (file_format.PALETTE if palette is not None else 0) | (file_format.COMPRESSED if compress else 0)
+        self.__index = []
+        self.__start = None
+        self.__error = None
+        self.__closed = False
+
+        self.__file = open(path, 'wb', buffering=1 << 20)
+        self.__file.write(self.__header(0, 0))
+        if palette is not None:
+            self.__file.write(self.__encoder.palette.tobytes())
+
+        # a full queue blocks write(): the recording never drops frames
+        self.__queue = queue.Queue(queue_size)
+        self.__thread = threading.Thread(target=self.__run, name="RecordingWriterThread", daemon=True)
+        self.__thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def __header(self, frame_count, index_offset):
+        palette_size = 0 if self.__encoder.palette is None else len(self.__encoder.palette)
+        header = file_format.Header(file_format.VERSION, len(Face), self.panel_size, self.__flags,
+                                    self.__encoder.keyframe_interval, frame_count, index_offset, palette_size)
+        return file_format.pack_header(header)
+
+    def write(self, frame, timestamp=None):
+        """Add a canvas frame, a (height, width, 3) array in the logical layout, to the recording.
+
+        timestamp is in seconds since the start of the recording; by default, the time since the first frame.
+        """
+        if self.__error:
+            raise self.__error
+        if self.__closed:
+            raise ValueError("The recording is closed")
+
+        now = time.monotonic()
+        if self.__start is None:
+            self.__start = now
+        if timestamp is None:
+            timestamp = now - self.__start
+
+        self.__queue.put((timestamp, file_format.canvas_to_faces(frame, self.panel_size)))
+        self.frames += 1
+
+    def close(self):
+        """Write the pending frames and the index, then close the file."""
+        if self.__closed:
+            return
+        self.__closed = True
+
+        self.__queue.put(None)
+        self.__thread.join()
+
+        index = np.array(self.__index, dtype=file_format.INDEX_ENTRY)
+        index_offset = self.__file.tell()
+        self.__file.write(index.tobytes())
+        self.__file.seek(0)
+        self.__file.write(self.__header(len(index), index_offset))
+        self.__file.close()
+
+        if self.__error:
+            raise self.__error
+
+    def __run(self):
+        while True:
+            item = self.__queue.get()
+            if item is None:
+                return
+            if self.__error:
+                continue
+
+            timestamp, faces = item
+            try:
+                encoding, payload = self.__encoder.encode(faces)
+                if self.compress:
+                    payload = zlib.compress(payload, self.COMPRESSION_LEVEL)
+
+                self.__index.append((self.__file.tell(), timestamp, encoding))
+                self.__file.write(file_format.FRAME.pack(encoding, timestamp, len(payload)))
+                self.__file.write(payload)
+            except Exception as e:
+                # reported to the caller by the next write() or by close()
+                self.__error = e